@@ -5,3 +5,6 @@ class CmsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cms'
 
+    def ready(self):
+        from .signals import connect_page_cache_signals
+        connect_page_cache_signals()
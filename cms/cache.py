@@ -0,0 +1,105 @@
+"""
+Versioned page cache for the public marketing pages.
+
+Every cached page is keyed on a CMS content version. Saving or deleting any
+CMS model (or a membership Plan) bumps the version, so the next request
+renders fresh content and old entries simply age out of the cache.
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+CONTENT_VERSION_KEY = 'cms:content_version'
+PAGE_KEY_PREFIX = 'cms:page'
+
+
+def get_content_version():
+    """Return the current CMS content version token."""
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        # add() so concurrent workers agree on a single initial version
+        cache.add(CONTENT_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(CONTENT_VERSION_KEY)
+    return version
+
+
+def bump_content_version():
+    """Invalidate every cached page by moving to a new content version."""
+    cache.set(CONTENT_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+_site_settings = None
+_site_settings_version = None
+
+
+def get_site_settings():
+    """
+    Return the SiteSettings singleton, cached per process.
+
+    The cached instance is reused for as long as the CMS content version is
+    unchanged, so other workers pick up admin edits on their next request.
+    Falls back to an unsaved default instance when none exists yet.
+    """
+    global _site_settings, _site_settings_version
+    from .models import SiteSettings
+
+    version = get_content_version()
+    if _site_settings is None or _site_settings_version != version:
+        _site_settings = SiteSettings.objects.order_by('pk').first() or SiteSettings()
+        _site_settings_version = version
+    return _site_settings
+
+
+def clear_site_settings():
+    global _site_settings, _site_settings_version
+    _site_settings = None
+    _site_settings_version = None
+
+
+def _has_pending_messages(request):
+    """True if the request carries flash messages that the page would render."""
+    if 'messages' in request.COOKIES:
+        return True
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return bool(request.session.get('_messages'))
+    return False
+
+
+def _is_cacheable(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    return not _has_pending_messages(request)
+
+
+def cache_public_page(view_func):
+    """
+    Serve anonymous GET requests from a full-page cache keyed on the CMS
+    content version and the full path including the query string, so
+    ``?page=2`` style variants are cached separately. Authenticated users
+    always get a fresh render.
+    """
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        if not _is_cacheable(request):
+            return view_func(request, *args, **kwargs)
+
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = f"{PAGE_KEY_PREFIX}:{get_content_version()}:{path}"
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming and not response.cookies:
+            timeout = getattr(settings, 'PAGE_CACHE_SECONDS', 60 * 60 * 24)
+            cache.set(key, (response.content, response['Content-Type']), timeout)
+        return response
+
+    return _wrapped
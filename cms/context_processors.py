@@ -1,15 +1,9 @@
-from .models import SiteSettings
+from .cache import get_site_settings
 
 def site_settings(request):
     """
     Context processor to make site settings available in all templates.
     """
-    try:
-        settings = SiteSettings.objects.get(pk=1)
-    except SiteSettings.DoesNotExist:
-        # Return default SiteSettings instance if none exists
-        settings = SiteSettings()
-
     return {
-        'site_settings': settings
-    }
\ No newline at end of file
+        'site_settings': get_site_settings()
+    }
@@ -0,0 +1,28 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from .cache import bump_content_version, clear_site_settings
+
+# Models whose rows never appear on the public pages; saving them must not
+# flush the page cache (ErrorLog is written on every 404).
+UNCACHED_MODELS = {'ErrorLog', 'MediaAsset'}
+
+
+def invalidate_page_cache(sender, **kwargs):
+    bump_content_version()
+
+
+def invalidate_site_settings(sender, **kwargs):
+    clear_site_settings()
+
+
+def connect_page_cache_signals():
+    models = [m for m in apps.get_app_config('cms').get_models() if m.__name__ not in UNCACHED_MODELS]
+    models += [apps.get_model('memberships', 'Plan'), apps.get_model('memberships', 'PlanFeature')]
+    for model in models:
+        post_save.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page_cache_save_{model._meta.label_lower}')
+        post_delete.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page_cache_delete_{model._meta.label_lower}')
+
+    site_settings = apps.get_model('cms', 'SiteSettings')
+    post_save.connect(invalidate_site_settings, sender=site_settings, dispatch_uid='site_settings_save')
+    post_delete.connect(invalidate_site_settings, sender=site_settings, dispatch_uid='site_settings_delete')
@@ -0,0 +1,145 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from PIL import Image
+
+from .cache import bump_content_version, cache_public_page, get_content_version
+from .models import HomeGalleryImage, MediaAsset
+from .uploads import create_assets, store_files
+
+
+@cache_public_page
+def echo_view(request):
+    echo_view.calls += 1
+    return HttpResponse(f"page {request.GET.get('page', '1')}")
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PublicPageCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        echo_view.calls = 0
+
+    def get(self, path):
+        request = RequestFactory().get(path)
+        request.user = AnonymousUser()
+        return echo_view(request)
+
+    def test_repeat_request_is_served_from_cache(self):
+        self.assertEqual(self.get('/about/').content, b'page 1')
+        self.assertEqual(self.get('/about/').content, b'page 1')
+        self.assertEqual(echo_view.calls, 1)
+
+    def test_query_string_variants_are_cached_separately(self):
+        self.assertEqual(self.get('/about/').content, b'page 1')
+        self.assertEqual(self.get('/about/?page=2').content, b'page 2')
+        self.assertEqual(self.get('/about/?page=2').content, b'page 2')
+        self.assertEqual(echo_view.calls, 2)
+
+    def test_content_version_bump_invalidates(self):
+        self.get('/about/')
+        bump_content_version()
+        self.get('/about/')
+        self.assertEqual(echo_view.calls, 2)
+
+
+def _png(name, size=(4, 3)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BulkUploadTests(TestCase):
+    """Storing uploads, bulk inserting their rows and cleaning up on failure."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('editor', 'editor@example.com', 'secret')
+
+    def stored(self, assets):
+        return [os.path.exists(asset.file.path) for asset in assets]
+
+    def test_storage_error_only_fails_that_file(self):
+        real_save = FileSystemStorage.save
+
+        def save(storage, name, content, *args, **kwargs):
+            if 'broken' in name:
+                raise OSError('disk full')
+            return real_save(storage, name, content, *args, **kwargs)
+
+        with mock.patch.object(FileSystemStorage, 'save', save):
+            assets, errors = store_files([_png('one.png'), _png('broken.png'), _png('two.png')], self.user)
+
+        self.assertEqual([asset.title for asset in assets], ['one.png', 'two.png'])
+        self.assertEqual([(error.filename, str(error.error)) for error in errors], [('broken.png', 'disk full')])
+        self.assertEqual(self.stored(assets), [True, True])
+        # The metadata MediaAsset.save() would fill in is computed up front
+        self.assertEqual((assets[0].width, assets[0].height, assets[0].asset_type), (4, 3, 'image'))
+        self.assertEqual(assets[0].file_size, _png('x.png').size)
+
+    def test_failed_insert_rolls_back_and_deletes_stored_files(self):
+        assets, _ = store_files([_png('a.png'), _png('b.png')], self.user, usage='gallery')
+        paths = [asset.file.path for asset in assets]
+        self.assertEqual(self.stored(assets), [True, True])
+
+        with mock.patch.object(HomeGalleryImage.objects, 'bulk_create', side_effect=RuntimeError('insert failed')):
+            with self.assertRaises(RuntimeError):
+                create_assets(assets, gallery_start_order=1)
+
+        self.assertFalse(MediaAsset.objects.exists())
+        self.assertFalse(HomeGalleryImage.objects.exists())
+        self.assertEqual([os.path.exists(path) for path in paths], [False, False])
+
+    def test_gallery_insert_bumps_content_version_on_commit(self):
+        version = get_content_version()
+        assets, _ = store_files([_png('a.png'), _png('b.png')], self.user, usage='gallery')
+        with self.captureOnCommitCallbacks(execute=True):
+            galleries = create_assets(assets, gallery_start_order=5)
+            self.assertEqual(get_content_version(), version)
+
+        self.assertNotEqual(get_content_version(), version)
+        self.assertEqual([(image.title, image.order) for image in galleries], [('a', 5), ('b', 6)])
+        self.assertEqual(MediaAsset.objects.filter(usage='gallery').count(), 2)
+
+    def test_pks_are_looked_up_when_bulk_insert_returns_none(self):
+        # MySQL can't return ids from bulk_create; the _fill_pks fallback finds them
+        assets, _ = store_files([_png('a.png'), _png('b.png')], self.user, usage='gallery')
+        with mock.patch.dict(connection.features.__dict__, {'can_return_rows_from_bulk_insert': False}):
+            with self.captureOnCommitCallbacks(execute=True):
+                galleries = create_assets(assets, gallery_start_order=1)
+
+        self.assertEqual(
+            [asset.pk for asset in assets],
+            list(MediaAsset.objects.order_by('pk').values_list('pk', flat=True)),
+        )
+        self.assertEqual(
+            [image.pk for image in galleries],
+            list(HomeGalleryImage.objects.order_by('pk').values_list('pk', flat=True)),
+        )
+        self.assertEqual(galleries[0].image_url, assets[0].get_absolute_url())
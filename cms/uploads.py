@@ -0,0 +1,131 @@
+"""
+Batched storage and inserts for the admin bulk uploaders.
+
+Each file is written to storage first, so a bad file only fails itself. The
+MediaAsset rows, and any HomeGalleryImage rows derived from them, are then
+inserted with bulk_create inside one transaction rather than one or two
+INSERTs per file. bulk_create() bypasses MediaAsset.save(), so the file size
+and image dimensions it would fill in are computed here, and it sends no
+post_save signals, so the page cache is invalidated explicitly.
+"""
+import traceback
+from dataclasses import dataclass
+
+from django.db import transaction
+
+from .cache import bump_content_version
+from .models import HomeGalleryImage, MediaAsset
+
+
+@dataclass
+class UploadError:
+    filename: str
+    error: Exception
+    traceback: str = ''
+
+
+def asset_type_for(filename):
+    """Guess the MediaAsset type from a file's extension."""
+    file_ext = filename.lower().split('.')[-1]
+    if file_ext in ['jpg', 'jpeg', 'png', 'gif', 'svg', 'webp']:
+        return 'image'
+    if file_ext in ['mp4', 'webm']:
+        return 'video'
+    if file_ext in ['pdf']:
+        return 'document'
+    return 'other'
+
+
+def _dimensions(uploaded_file):
+    """(width, height) of an image upload, or (None, None) if it can't be read."""
+    try:
+        from PIL import Image
+        with Image.open(uploaded_file) as img:
+            return img.size
+    except Exception:
+        return None, None
+    finally:
+        uploaded_file.seek(0)
+
+
+def store_files(files, user, usage=None):
+    """
+    Write each upload to storage and build an unsaved MediaAsset for it.
+    ``usage`` is applied to image assets. Returns (assets, errors); a file
+    that fails is reported in ``errors`` and skipped.
+    """
+    assets = []
+    errors = []
+    for uploaded_file in files:
+        try:
+            asset = MediaAsset(
+                title=uploaded_file.name,
+                asset_type=asset_type_for(uploaded_file.name),
+                uploaded_by=user,
+            )
+            if usage and asset.asset_type == 'image':
+                asset.usage = usage
+            asset.file_size = uploaded_file.size
+            asset.width, asset.height = _dimensions(uploaded_file)
+            asset.file.save(uploaded_file.name, uploaded_file, save=False)
+        except Exception as e:
+            errors.append(UploadError(uploaded_file.name, e, traceback.format_exc()))
+            continue
+        assets.append(asset)
+    return assets, errors
+
+
+def discard_files(assets):
+    """Delete stored files whose rows were never inserted."""
+    for asset in assets:
+        try:
+            asset.file.delete(save=False)
+        except Exception:
+            pass
+
+
+def _fill_pks(model, objs, field, value):
+    # Backends that can't return ids from bulk_create (MySQL) leave pk unset;
+    # look them up by a value unique to each new row.
+    if all(obj.pk is not None for obj in objs):
+        return
+    ids = dict(
+        model.objects.filter(**{f'{field}__in': [value(obj) for obj in objs]})
+        .order_by('pk').values_list(field, 'pk')
+    )
+    for obj in objs:
+        obj.pk = ids.get(value(obj))
+
+
+def create_assets(assets, gallery_start_order=None):
+    """
+    Insert ``assets`` and, when ``gallery_start_order`` is given, one
+    HomeGalleryImage per asset numbered from it, in a single transaction.
+    Returns the gallery images. If the insert fails nothing is saved, the
+    stored files are deleted and the exception propagates.
+    """
+    galleries = []
+    try:
+        with transaction.atomic():
+            MediaAsset.objects.bulk_create(assets)
+            _fill_pks(MediaAsset, assets, 'file', lambda asset: asset.file.name)
+            if gallery_start_order is not None:
+                galleries = [
+                    HomeGalleryImage(
+                        # Title from the filename without its extension
+                        title=asset.title.rsplit('.', 1)[0],
+                        image_url=asset.get_absolute_url(),
+                        description='',
+                        order=gallery_start_order + i,
+                        is_active=True,
+                    )
+                    for i, asset in enumerate(assets)
+                ]
+                HomeGalleryImage.objects.bulk_create(galleries)
+                _fill_pks(HomeGalleryImage, galleries, 'image_url', lambda image: image.image_url)
+                # Show the new images on the cached home page once committed
+                transaction.on_commit(bump_content_version)
+    except Exception:
+        discard_files(assets)
+        raise
+    return galleries
@@ -1,3 +1,5 @@
+import traceback
+
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
@@ -6,7 +8,8 @@ from django.shortcuts import redirect, render
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 
-from .models import Testimonial, MediaAsset, HomeGalleryImage, ErrorLog
+from .models import Testimonial, HomeGalleryImage, ErrorLog
+from .uploads import UploadError, create_assets, store_files
 
 
 def testimonials(request):
@@ -43,6 +46,24 @@ def bulk_upload_media(request):
     return redirect('admin:cms_mediaasset_changelist')
 
 
+def _log_upload_error(request, label, failure):
+    """Server-side diagnostic logging for a file that failed to upload."""
+    try:
+        ErrorLog.objects.create(
+            severity='ERROR',
+            message=f"Bulk upload ({label}) failed for {failure.filename}: {failure.error}",
+            path=request.path,
+            method=request.method,
+            user=getattr(request.user, 'username', ''),
+            ip_address=request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0] or request.META.get('REMOTE_ADDR', ''),
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+            exception_type=type(failure.error).__name__,
+            traceback=failure.traceback,
+        )
+    except Exception:
+        pass
+
+
 @staff_member_required
 @require_POST
 def ajax_upload_media(request):
@@ -65,60 +86,24 @@ def ajax_upload_media(request):
             pass
         return JsonResponse({'error': 'No files provided'}, status=400)
 
-    uploaded_files = []
-    errors = []
-
-    for uploaded_file in request.FILES.getlist('files'):
-        try:
-            # Auto-detect asset type
-            file_ext = uploaded_file.name.lower().split('.')[-1]
-            if file_ext in ['jpg', 'jpeg', 'png', 'gif', 'svg', 'webp']:
-                asset_type = 'image'
-            elif file_ext in ['mp4', 'webm']:
-                asset_type = 'video'
-            elif file_ext in ['pdf']:
-                asset_type = 'document'
-            else:
-                asset_type = 'other'
-
-            # Create MediaAsset
-            media_asset = MediaAsset(
-                title=uploaded_file.name,
-                file=uploaded_file,
-                asset_type=asset_type,
-                uploaded_by=request.user
-            )
-
-            # Save to trigger file size/dimension detection
-            media_asset.save()
-
-            uploaded_files.append({
-                'id': media_asset.id,
-                'title': media_asset.title,
-                'url': media_asset.get_absolute_url(),
-                'asset_type': media_asset.asset_type,
-                'file_size': media_asset.file_size,
-                'dimensions': f"{media_asset.width}×{media_asset.height}" if media_asset.width else None
-            })
-
-        except Exception as e:
-            errors.append({'filename': uploaded_file.name, 'error': str(e)})
-            # Server-side diagnostic logging
-            try:
-                import traceback as _tb
-                ErrorLog.objects.create(
-                    severity='ERROR',
-                    message=f"Bulk upload (media) failed for {uploaded_file.name}: {e}",
-                    path=request.path,
-                    method=request.method,
-                    user=getattr(request.user, 'username', ''),
-                    ip_address=request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0] or request.META.get('REMOTE_ADDR', ''),
-                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                    exception_type=type(e).__name__,
-                    traceback=_tb.format_exc(),
-                )
-            except Exception:
-                pass
+    assets, failures = store_files(request.FILES.getlist('files'), request.user)
+    try:
+        create_assets(assets)
+    except Exception as e:
+        failures += [UploadError(asset.title, e, traceback.format_exc()) for asset in assets]
+        assets = []
+
+    uploaded_files = [{
+        'id': media_asset.id,
+        'title': media_asset.title,
+        'url': media_asset.get_absolute_url(),
+        'asset_type': media_asset.asset_type,
+        'file_size': media_asset.file_size,
+        'dimensions': f"{media_asset.width}×{media_asset.height}" if media_asset.width else None
+    } for media_asset in assets]
+    errors = [{'filename': failure.filename, 'error': str(failure.error)} for failure in failures]
+    for failure in failures:
+        _log_upload_error(request, 'media', failure)
 
     return JsonResponse({
         'success': True,
@@ -161,72 +146,28 @@ def ajax_upload_home_gallery(request):
             pass
         return JsonResponse({'error': 'No files provided'}, status=400)
 
-    uploaded = []
-    errors = []
-
     # Determine starting order
     try:
         start_order = (HomeGalleryImage.objects.order_by('-order').first().order or 0) + 1
     except Exception:
         start_order = 1
 
-    order_counter = start_order
-
-    for f in files:
-        try:
-            # Save to MediaAsset for library reference
-            file_ext = f.name.lower().split('.')[-1]
-            if file_ext in ['jpg', 'jpeg', 'png', 'gif', 'svg', 'webp']:
-                asset_type = 'image'
-            elif file_ext in ['mp4', 'webm']:
-                asset_type = 'video'
-            elif file_ext in ['pdf']:
-                asset_type = 'document'
-            else:
-                asset_type = 'other'
-
-            ma = MediaAsset(title=f.name, file=f, asset_type=asset_type, uploaded_by=request.user)
-            # Set usage to gallery if image
-            if asset_type == 'image':
-                ma.usage = 'gallery'
-            ma.save()
-
-            # Derive title from filename (without extension)
-            title = f.name.rsplit('.', 1)[0]
-
-            # Create HomeGalleryImage
-            hgi = HomeGalleryImage.objects.create(
-                title=title,
-                image_url=ma.get_absolute_url(),
-                description='',
-                order=order_counter,
-                is_active=True,
-            )
-            order_counter += 1
-
-            uploaded.append({
-                'id': hgi.id,
-                'title': hgi.title,
-                'image_url': hgi.image_url,
-                'order': hgi.order,
-            })
-        except Exception as e:
-            errors.append({'filename': f.name, 'error': str(e)})
-            try:
-                import traceback as _tb
-                ErrorLog.objects.create(
-                    severity='ERROR',
-                    message=f"Bulk upload (home gallery) failed for {f.name}: {e}",
-                    path=request.path,
-                    method=request.method,
-                    user=getattr(request.user, 'username', ''),
-                    ip_address=request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0] or request.META.get('REMOTE_ADDR', ''),
-                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                    exception_type=type(e).__name__,
-                    traceback=_tb.format_exc(),
-                )
-            except Exception:
-                pass
+    assets, failures = store_files(files, request.user, usage='gallery')
+    try:
+        galleries = create_assets(assets, gallery_start_order=start_order)
+    except Exception as e:
+        failures += [UploadError(asset.title, e, traceback.format_exc()) for asset in assets]
+        galleries = []
+
+    uploaded = [{
+        'id': hgi.id,
+        'title': hgi.title,
+        'image_url': hgi.image_url,
+        'order': hgi.order,
+    } for hgi in galleries]
+    errors = [{'filename': failure.filename, 'error': str(failure.error)} for failure in failures]
+    for failure in failures:
+        _log_upload_error(request, 'home gallery', failure)
 
     return JsonResponse({
         'success': True,
@@ -0,0 +1,72 @@
+from django.contrib import admin
+from django.contrib.admin.utils import model_ngettext
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .exports import EXPORTERS, export_choices
+from .models import ExportJob
+from .work_queue import make_due
+
+
+class RetryNowMixin:
+    """
+    'Retry now' action for work-queue models (see core.work_queue). Rows in
+    ``retry_done_status`` have already succeeded and are left alone.
+    """
+    retry_done_status = None
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        count = make_due(queryset.exclude(status=self.retry_done_status))
+        self.message_user(request, f'{count} {model_ngettext(self.opts, count)} queued for another attempt.')
+    retry_now.short_description = 'Retry selected %(verbose_name_plural)s now'
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "kind_label", "status", "progress", "requested_by", "created_at", "finished_at", "download_link")
+    list_filter = ("status", "kind", "output_format")
+    readonly_fields = ("kind", "output_format", "compress", "status", "requested_by", "total_rows", "rows_written", "progress",
+                       "download_link", "error", "created_at", "started_at", "finished_at")
+    exclude = ("object_ids", "file")
+
+    def has_add_permission(self, request):
+        # Jobs are created from the export actions on each model's changelist
+        return False
+
+    def kind_label(self, obj):
+        export_choices()  # make sure every app's exporters are registered
+        exporter = EXPORTERS.get(obj.kind)
+        return exporter.label if exporter else obj.kind
+    kind_label.short_description = "Export"
+
+    def progress(self, obj):
+        return f"{obj.rows_written} / {obj.total_rows} ({obj.progress_percentage}%)"
+    progress.short_description = "Progress"
+
+    def download_link(self, obj):
+        if obj.status != 'done' or not obj.file:
+            return "-"
+        url = reverse('admin:core_exportjob_download', args=[obj.pk])
+        return format_html('<a href="{}">Download</a>', url)
+    download_link.short_description = "File"
+
+    def get_urls(self):
+        urls = [
+            path('<int:pk>/download/', self.admin_site.admin_view(self.download_view), name='core_exportjob_download'),
+        ]
+        return urls + super().get_urls()
+
+    def has_download_permission(self, request, obj):
+        # Export files hold member data; only the requester gets theirs by default
+        if not self.has_view_permission(request, obj):
+            return False
+        return obj.requested_by_id == request.user.pk or request.user.has_perm('core.download_any_exportjob')
+
+    def download_view(self, request, pk):
+        job = get_object_or_404(ExportJob, pk=pk, status='done')
+        if not self.has_download_permission(request, job) or not job.file:
+            raise Http404
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=job.file.name.rsplit('/', 1)[-1])
@@ -0,0 +1,173 @@
+"""
+Background export jobs.
+
+Admin actions call enqueue_export(), which records the selection as an
+ExportJob. The run_export_jobs command (run from cron) claims pending jobs
+and writes each file under MEDIA_ROOT/exports/ in chunks, as CSV (optionally
+gzipped) or as Parquet/.npz, updating the job's progress as it goes.
+"""
+import csv
+import gzip
+import logging
+import os
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib import messages
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
+
+from . import columnar
+from .exports import EXPORT_CHUNK_SIZE, get_exporter
+from .models import ExportJob
+from .querysets import id_chunks
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = 'exports'
+
+# A job left 'running' longer than this (crashed worker) is started again
+STALE_AFTER = timedelta(hours=1)
+
+
+def enqueue_export(kind, queryset=None, user=None, compress=False, output_format='csv'):
+    """Queue an export of ``queryset`` (or every row when None)."""
+    exporter = get_exporter(kind)  # fail early on unknown kinds
+    if output_format == 'columnar' and not exporter.columns:
+        raise ValueError(f"The {kind} export has no columnar definition")
+    ids = list(queryset.order_by().values_list('pk', flat=True)) if queryset is not None else None
+    return ExportJob.objects.create(
+        kind=kind,
+        object_ids=ids,
+        compress=compress and output_format == 'csv',
+        output_format=output_format,
+        requested_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def background_export_action(kind, description, compress=False, output_format='csv'):
+    """Build an admin action that queues a background export of the selection."""
+    def action(modeladmin, request, queryset):
+        job = enqueue_export(kind, queryset, user=request.user, compress=compress, output_format=output_format)
+        modeladmin.message_user(
+            request,
+            format_html(
+                'Export #{} queued for {} row(s). <a href="{}">Track progress and download it here</a>.',
+                job.pk, len(job.object_ids), reverse('admin:core_exportjob_change', args=[job.pk]),
+            ),
+            messages.SUCCESS,
+        )
+    action.__name__ = f'export_{kind}_background' + ('_gz' if compress else '')
+    if output_format != 'csv':
+        action.__name__ += f'_{output_format}'
+    action.short_description = description
+    return action
+
+
+def claim_job():
+    """Atomically claim the oldest due job, or return None."""
+    now = timezone.now()
+    due = Q(status='pending') | Q(status='running', started_at__lt=now - STALE_AFTER)
+    for pk in ExportJob.objects.filter(due).order_by('created_at').values_list('pk', flat=True)[:5]:
+        if ExportJob.objects.filter(due, pk=pk).update(status='running', started_at=now, rows_written=0, error=''):
+            return ExportJob.objects.get(pk=pk)
+    return None
+
+
+def _querysets(exporter, ids):
+    # Each queryset is then read in pk-keyset chunks by the writers
+    if ids is None:
+        yield exporter.get_queryset()
+        return
+    for chunk in id_chunks(ids):
+        yield exporter.get_queryset(chunk)
+
+
+def _open(path, compress):
+    if compress:
+        return gzip.open(path, 'wt', newline='', encoding='utf-8')
+    return open(path, 'w', newline='', encoding='utf-8')
+
+
+def _write_csv(job, exporter, path):
+    written = 0
+    with _open(path, job.compress) as fh:
+        writer = csv.writer(fh)
+        writer.writerow(exporter.header)
+        for queryset in _querysets(exporter, job.object_ids):
+            for row in exporter.rows(queryset):
+                writer.writerow(row)
+                written += 1
+                if written % EXPORT_CHUNK_SIZE == 0:
+                    ExportJob.objects.filter(pk=job.pk).update(rows_written=written)
+    return written
+
+
+def _write_columnar(job, exporter, path, fmt):
+    def progress(written):
+        ExportJob.objects.filter(pk=job.pk).update(rows_written=written)
+
+    with open(path, 'wb') as fh:
+        return columnar.write_columnar(
+            exporter.columns, _querysets(exporter, job.object_ids), fh, fmt, EXPORT_CHUNK_SIZE, progress=progress
+        )
+
+
+def run_job(job):
+    """Build the export file for a claimed job; marks it done or failed."""
+    exporter = get_exporter(job.kind)
+    fmt = None
+    if job.output_format == 'columnar':
+        fmt = columnar.available_format()
+        if fmt is None:
+            ExportJob.objects.filter(pk=job.pk).update(
+                status='failed', error='Columnar exports need pyarrow or numpy installed.', finished_at=timezone.now()
+            )
+            return False
+        extension = columnar.EXTENSIONS[fmt]
+    else:
+        extension = 'csv.gz' if job.compress else 'csv'
+    # Random token so export file URLs cannot be guessed
+    name = f"{EXPORT_DIR}/{exporter.name}_export_{job.pk}_{secrets.token_hex(8)}.{extension}"
+    path = os.path.join(settings.MEDIA_ROOT, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    try:
+        if job.object_ids is None:
+            total = exporter.get_queryset().count()
+        else:
+            total = len(job.object_ids)
+        ExportJob.objects.filter(pk=job.pk).update(total_rows=total)
+
+        if fmt is None:
+            written = _write_csv(job, exporter, path)
+        else:
+            written = _write_columnar(job, exporter, path, fmt)
+    except Exception as e:
+        logger.exception("Export job %s failed", job.pk)
+        if os.path.exists(path):
+            os.remove(path)
+        ExportJob.objects.filter(pk=job.pk).update(status='failed', error=str(e), finished_at=timezone.now())
+        return False
+
+    ExportJob.objects.filter(pk=job.pk).update(
+        status='done', file=name, rows_written=written, finished_at=timezone.now()
+    )
+    return True
+
+
+def run_pending_jobs(max_jobs=None):
+    """Run due jobs one after another; returns (done, failed) counts."""
+    done = failed = 0
+    while max_jobs is None or done + failed < max_jobs:
+        job = claim_job()
+        if job is None:
+            break
+        if run_job(job):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Build queued admin export files under MEDIA_ROOT/exports/ (run from cron, e.g. every minute)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-jobs', type=int, default=None, help='Stop after this many jobs')
+
+    def handle(self, *args, **options):
+        done, failed = run_pending_jobs(max_jobs=options['max_jobs'])
+        self.stdout.write(self.style.SUCCESS(f"Finished {done} export job(s), {failed} failed."))
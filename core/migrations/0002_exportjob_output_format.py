@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='output_format',
+            field=models.CharField(choices=[('csv', 'CSV'), ('columnar', 'Parquet / NumPy (.npz)')], default='csv', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='exportjob',
+            name='compress',
+            field=models.BooleanField(default=False, help_text='Gzip the output file (CSV only)'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:31
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_exportjob_output_format'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='exportjob',
+            options={'ordering': ['-created_at'], 'permissions': [('download_any_exportjob', 'Can download export files requested by others')]},
+        ),
+    ]
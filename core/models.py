@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db import models
+
+
+class ExportJob(models.Model):
+    """
+    A data export built in the background by the run_export_jobs command and
+    written under MEDIA_ROOT/exports/. ``kind`` names a registered exporter
+    (see core.exports).
+    """
+    STATUSES = (
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    )
+    FORMATS = (
+        ("csv", "CSV"),
+        ("columnar", "Parquet / NumPy (.npz)"),
+    )
+
+    kind = models.CharField(max_length=50)
+    object_ids = models.JSONField(null=True, blank=True, help_text='Selected primary keys; empty exports every row')
+    compress = models.BooleanField(default=False, help_text='Gzip the output file (CSV only)')
+    output_format = models.CharField(max_length=10, choices=FORMATS, default='csv')
+    status = models.CharField(max_length=10, choices=STATUSES, default='pending')
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    total_rows = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to='exports/', blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='exportjob_status_created_idx'),
+        ]
+        permissions = [
+            ("download_any_exportjob", "Can download export files requested by others"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} export #{self.pk} ({self.status})"
+
+    @property
+    def progress_percentage(self):
+        if self.status == 'done':
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(int(self.rows_written / self.total_rows * 100), 100)
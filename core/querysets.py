@@ -0,0 +1,35 @@
+"""
+Chunked iteration over large querysets.
+
+``QuerySet.iterator()`` relies on server-side cursors, which PyMySQL doesn't
+use: on MySQL the driver buffers the whole result set client-side before
+yielding the first row. The helpers here instead walk the table in primary
+key order, one ``pk > last`` query per chunk, so memory stays bounded by the
+chunk size on every backend.
+"""
+from operator import attrgetter
+
+# Primary keys per query when iterating an explicit selection (keeps IN lists bounded)
+ID_CHUNK_SIZE = 900
+
+
+def keyset_chunks(queryset, chunk_size, key=attrgetter('pk')):
+    """
+    Yield lists of up to ``chunk_size`` results of ``queryset`` in primary key
+    order. ``key`` returns the pk of a result; pass ``itemgetter(0)`` for a
+    values_list() that starts with 'pk'.
+    """
+    queryset = queryset.order_by('pk')
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        yield chunk
+        if len(chunk) < chunk_size:
+            break
+        chunk = list(queryset.filter(pk__gt=key(chunk[-1]))[:chunk_size])
+
+
+def id_chunks(ids, chunk_size=ID_CHUNK_SIZE):
+    """Split a selection of primary keys into ascending lists of ``chunk_size``."""
+    ids = sorted(ids)
+    for start in range(0, len(ids), chunk_size):
+        yield ids[start:start + chunk_size]
@@ -0,0 +1,170 @@
+import io
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from memberships.models import Plan, Subscription
+from payments.models import Payment
+
+from . import columnar
+from .columnar import Column
+from .models import ExportJob
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class ExportDownloadPermissionTests(TestCase):
+    """Export files go to their requester, or to staff allowed to download any export."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        view = Permission.objects.get(codename='view_exportjob')
+        cls.requester, cls.colleague, cls.auditor = [
+            get_user_model().objects.create_user(name, f'{name}@example.com', 'secret', is_staff=True)
+            for name in ('requester', 'colleague', 'auditor')
+        ]
+        for user in (cls.requester, cls.colleague, cls.auditor):
+            user.user_permissions.add(view)
+        cls.auditor.user_permissions.add(Permission.objects.get(codename='download_any_exportjob'))
+
+    def setUp(self):
+        self.job = ExportJob.objects.create(kind='users', status='done', requested_by=self.requester)
+        self.job.file.save('exports/users_export.csv', ContentFile(b'id\n1\n'))
+        self.url = reverse('admin:core_exportjob_download', args=[self.job.pk])
+
+    def download_as(self, user):
+        self.client.force_login(user)
+        return self.client.get(self.url)
+
+    def test_requester_can_download(self):
+        response = self.download_as(self.requester)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'id\n1\n')
+
+    def test_other_staff_cannot_download(self):
+        with self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.download_as(self.colleague).status_code, 404)
+
+    def test_download_any_permission_allows_download(self):
+        self.assertEqual(self.download_as(self.auditor).status_code, 200)
+
+
+class ColumnarExportTests(TestCase):
+    """Typed columnar files written in several chunks, with missing values."""
+
+    columns = [
+        Column('subscription_id', 'id', 'int'),
+        Column('payment_id', 'payment__id', 'int'),
+        Column('payment_amount', 'payment__amount', 'float'),
+        Column('completed_at', 'payment__completed_at', 'datetime'),
+        Column('start_date', 'start_date', 'date'),
+        Column('plan', 'plan__name', 'str'),
+        Column('active', 'payment__user__is_active', 'bool'),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user('analyst', 'analyst@example.com', 'secret')
+        plan = Plan.objects.create(name='Monthly', price=100, duration_days=30)
+        cls.today = timezone.localdate()
+        cls.completed_at = timezone.now().replace(microsecond=0)
+        cls.subscriptions = []
+        for i in range(5):
+            payment = None
+            if i % 2 == 0:
+                payment = Payment.objects.create(
+                    user=user, plan=plan, amount=1000 * (i + 1), currency='NGN', provider='fake',
+                    reference=f'M7_col{i}', status='successful', completed_at=cls.completed_at,
+                )
+            cls.subscriptions.append(Subscription.objects.create(
+                user=user, plan=plan, payment=payment, start_date=cls.today - timedelta(days=i),
+            ))
+
+    def write(self, fmt):
+        fileobj = io.BytesIO()
+        rows = columnar.write_columnar(self.columns, [Subscription.objects.all()], fileobj, fmt, chunk_size=2)
+        fileobj.seek(0)
+        return rows, fileobj
+
+    def test_column_chunks_split_rows(self):
+        chunks = list(columnar.column_chunks(self.columns, [Subscription.objects.all()], 2))
+        self.assertEqual([len(chunk[0]) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(chunks[0][0], [sub.pk for sub in self.subscriptions[:2]])
+
+    @unittest.skipUnless(numpy, 'numpy is not installed')
+    def test_npz_round_trip(self):
+        rows, fileobj = self.write('npz')
+        archive = numpy.load(fileobj)
+
+        self.assertEqual(rows, 5)
+        self.assertEqual(archive['subscription_id'].dtype, numpy.int64)
+        self.assertEqual(archive['subscription_id'].tolist(), [sub.pk for sub in self.subscriptions])
+        # Nullable ints stay int64; the mask flags the rows without a payment
+        self.assertEqual(archive['payment_id'].dtype, numpy.int64)
+        self.assertEqual(archive['payment_id__mask'].tolist(), [False, True, False, True, False])
+        self.assertEqual(archive['payment_id'][1], columnar.INT_SENTINEL)
+        self.assertNotIn('subscription_id__mask', archive)
+        amounts = archive['payment_amount']
+        self.assertEqual(amounts.dtype, numpy.float64)
+        self.assertEqual(numpy.isnan(amounts).tolist(), [False, True, False, True, False])
+        self.assertEqual(amounts[4], 5000.0)
+        completed = archive['completed_at']
+        self.assertEqual(completed.dtype, numpy.dtype('datetime64[us]'))
+        self.assertEqual(numpy.isnat(completed).tolist(), [False, True, False, True, False])
+        self.assertEqual(
+            completed[0].item(), self.completed_at.astimezone(dt_timezone.utc).replace(tzinfo=None)
+        )
+        self.assertEqual(archive['start_date'].dtype, numpy.dtype('datetime64[D]'))
+        self.assertEqual(archive['start_date'][2].item(), self.today - timedelta(days=2))
+        self.assertEqual(archive['plan'].tolist(), ['Monthly'] * 5)
+
+    @unittest.skipUnless(numpy, 'numpy is not installed')
+    def test_npz_empty_export_keeps_dtypes(self):
+        fileobj = io.BytesIO()
+        rows = columnar.write_columnar(self.columns, [Subscription.objects.none()], fileobj, 'npz', chunk_size=2)
+        fileobj.seek(0)
+        archive = numpy.load(fileobj)
+
+        self.assertEqual(rows, 0)
+        self.assertEqual(archive['payment_id'].dtype, numpy.int64)
+        self.assertEqual(len(archive['payment_id']), 0)
+
+    @unittest.skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_parquet_round_trip(self):
+        rows, fileobj = self.write('parquet')
+        table = pyarrow.parquet.read_table(fileobj)
+
+        self.assertEqual((rows, table.num_rows), (5, 5))
+        self.assertEqual(table.num_columns, len(self.columns))
+        self.assertEqual(table.column('payment_id').null_count, 2)
+        self.assertEqual(str(table.schema.field('payment_id').type), 'int64')
+        self.assertEqual(table.column('completed_at').null_count, 2)
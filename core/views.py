@@ -3,17 +3,20 @@ from django.contrib import messages
 from django.conf import settings
 from django.core.mail import send_mail
 from cms.models import (
-    HeroSlide, SiteSettings, Program, Service, Partner, Testimonial,
+    HeroSlide, Program, Service, Partner, Testimonial,
     AboutPage, CoreValue, WhyChooseUsItem, AboutGalleryImage, AboutStatistic,
     Facility, TeamMember, FacilitiesPage, TeamPage, HomeGalleryImage
 )
+from cms.cache import cache_public_page, get_site_settings
 from memberships.models import Plan
+from notifications.mail_queue import enqueue_email, queue_enabled
 from django.db.models import Avg
 from .forms import ContactForm
 
 
+@cache_public_page
 def home(request):
-    settings_obj = SiteSettings.objects.first()
+    settings_obj = get_site_settings()
     programs = Program.objects.all()[:8]
     services = Service.objects.all()[:8]
     partners = Partner.objects.all()[:8]
@@ -36,6 +39,7 @@ def home(request):
     return render(request, 'core/home.html', ctx)
 
 
+@cache_public_page
 def about(request):
     about_page = AboutPage.objects.first()
     core_values = CoreValue.objects.filter(is_active=True)
@@ -53,6 +57,7 @@ def about(request):
     return render(request, 'core/about.html', ctx)
 
 
+@cache_public_page
 def facilities(request):
     facilities_page = FacilitiesPage.objects.first()
     facilities = Facility.objects.filter(is_active=True)
@@ -84,6 +89,7 @@ def facilities(request):
     return render(request, 'core/facilities.html', ctx)
 
 
+@cache_public_page
 def team(request):
     team_page = TeamPage.objects.first()
     team_members = TeamMember.objects.filter(is_active=True)
@@ -114,7 +120,7 @@ def careers(request):
 
 
 def contact(request):
-    site = SiteSettings.objects.first()
+    site = get_site_settings()
     if request.method == 'POST':
         form = ContactForm(request.POST)
         if form.is_valid():
@@ -136,7 +142,11 @@ def contact(request):
                 f"Message:\n{message}\n"
             )
             try:
-                send_mail(full_subject, body, getattr(settings, 'DEFAULT_FROM_EMAIL', email), to_emails, fail_silently=False)
+                from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', email)
+                if queue_enabled():
+                    enqueue_email(full_subject, body, to_emails, from_email=from_email)
+                else:
+                    send_mail(full_subject, body, from_email, to_emails, fail_silently=False)
                 messages.success(request, 'Thanks for reaching out! We\'ll get back to you shortly.')
                 return redirect('core:contact')
             except Exception as e:
@@ -0,0 +1,78 @@
+"""
+Shared machinery for the database-backed work queues (outbound emails,
+payment webhook events).
+
+A queue model has ``status``, ``attempts``, ``next_attempt_at``,
+``locked_at`` and ``last_error`` fields. A worker claims due rows with a
+conditional UPDATE, handles them and either finishes them or schedules a
+retry with exponential backoff; rows that keep failing move to a terminal
+status instead.
+"""
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+# A row left locked longer than this (crashed worker) is claimed again
+STALE_LOCK_AFTER = timedelta(minutes=15)
+
+
+def retry_delay(attempts, base_seconds=60, max_seconds=24 * 60 * 60):
+    """Exponential backoff: base, 2*base, 4*base, ... capped at ``max_seconds``."""
+    return timedelta(seconds=min(base_seconds * (2 ** max(attempts - 1, 0)), max_seconds))
+
+
+def claim_batch(model, batch_size, locked_status):
+    """
+    Lock up to ``batch_size`` due rows of ``model`` for this worker by moving
+    them to ``locked_status``, and return them.
+
+    The conditional UPDATE makes the claim safe when two workers overlap.
+    """
+    now = timezone.now()
+    due = Q(status='pending', next_attempt_at__lte=now) | Q(status=locked_status, locked_at__lt=now - STALE_LOCK_AFTER)
+    candidates = list(
+        model.objects.filter(due).order_by('next_attempt_at', 'pk').values_list('pk', flat=True)[:batch_size]
+    )
+    if not candidates:
+        return []
+    model.objects.filter(due, pk__in=candidates).update(status=locked_status, locked_at=now)
+    return list(model.objects.filter(pk__in=candidates, status=locked_status, locked_at=now))
+
+
+def schedule_retry(row, error, max_attempts, failed_status, delay=retry_delay):
+    """
+    Record a failed attempt on a claimed row: back to 'pending' after
+    ``delay(attempts)``, or ``failed_status`` once ``max_attempts`` is reached.
+    Returns the row's new status.
+    """
+    row.attempts += 1
+    row.last_error = error
+    row.locked_at = None
+    if row.attempts >= max_attempts:
+        row.status = failed_status
+    else:
+        row.status = 'pending'
+        row.next_attempt_at = timezone.now() + delay(row.attempts)
+    row.save(update_fields=['attempts', 'last_error', 'locked_at', 'status', 'next_attempt_at'])
+    return row.status
+
+
+def drain(claim, handle, max_batches=None):
+    """
+    Call ``handle(rows)`` for each batch returned by ``claim()`` until it
+    returns none (or ``max_batches`` is reached). Returns the batch count.
+    """
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        rows = claim()
+        if not rows:
+            break
+        handle(rows)
+        batches += 1
+    return batches
+
+
+def make_due(queryset):
+    """Make rows due for a fresh set of attempts now; returns how many changed."""
+    return queryset.update(status='pending', attempts=0, next_attempt_at=timezone.now(), locked_at=None)
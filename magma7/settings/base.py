@@ -57,6 +57,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'notifications.middleware.NotificationsMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'cms.middleware.ErrorLoggingMiddleware',
@@ -107,6 +108,16 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache
+# File-based so every Passenger worker sees the same CMS content version.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_DIR', str(BASE_DIR / 'tmp' / 'django_cache')),
+    }
+}
+PAGE_CACHE_SECONDS = int(os.getenv('PAGE_CACHE_SECONDS', str(60 * 60 * 24)))
+
 # Auth redirects
 LOGIN_REDIRECT_URL = 'memberships:dashboard'
 LOGOUT_REDIRECT_URL = 'core:home'
@@ -119,6 +130,12 @@ EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', '1') == '1'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'no-reply@magma7fitness.local')
+NOTIFICATION_EMAIL_BATCH_SIZE = int(os.getenv('NOTIFICATION_EMAIL_BATCH_SIZE', '100'))
+# Outbound email queue (drained by `manage.py process_email_queue` from cron, see
+# DEPLOYMENT_GUIDE.md step 12.3; set EMAIL_QUEUE_ENABLED=0 if cron isn't available)
+EMAIL_QUEUE_ENABLED = os.getenv('EMAIL_QUEUE_ENABLED', '1') == '1'
+EMAIL_QUEUE_MAX_ATTEMPTS = int(os.getenv('EMAIL_QUEUE_MAX_ATTEMPTS', '5'))
+EMAIL_QUEUE_RETRY_BASE_SECONDS = int(os.getenv('EMAIL_QUEUE_RETRY_BASE_SECONDS', '60'))
 
 SITE_NAME = 'Magma7Fitness'
 
@@ -176,15 +193,26 @@ JAZZMIN_UI_TWEAKS = {
 
 # Payments
 PAYMENTS_ENABLED = os.getenv('PAYMENTS_ENABLED', '1') == '1'  # Enabled by default
-PAYMENT_PROVIDER = os.getenv('PAYMENT_PROVIDER', 'paystack')  # 'paystack' or 'stripe'
+PAYMENT_PROVIDER = os.getenv('PAYMENT_PROVIDER', 'paystack')  # 'paystack', 'stripe' or 'fake' (local testing only)
 SITE_URL = os.getenv('SITE_URL', 'http://127.0.0.1:8000')
 PAYSTACK_PUBLIC_KEY = os.getenv('PAYSTACK_PUBLIC_KEY', 'pk_test_96b9995fbf552beec8da11acbb821aa5c1d06341')  # Replace with your test key
 PAYSTACK_SECRET_KEY = os.getenv('PAYSTACK_SECRET_KEY', 'sk_test_96b9995fbf552beec8da11acbb821aa5c1d06341')  # Replace with your test key
+PAYSTACK_BASE_URL = os.getenv('PAYSTACK_BASE_URL', 'https://api.paystack.co')
+PAYSTACK_CONNECT_TIMEOUT = float(os.getenv('PAYSTACK_CONNECT_TIMEOUT', '3.05'))
+PAYSTACK_READ_TIMEOUT = float(os.getenv('PAYSTACK_READ_TIMEOUT', '10'))
+PAYSTACK_POOL_SIZE = int(os.getenv('PAYSTACK_POOL_SIZE', '10'))  # Keep-alive connections per process
+PAYSTACK_MAX_RETRIES = int(os.getenv('PAYSTACK_MAX_RETRIES', '2'))  # Verify retries on 5xx/connection errors
+PAYMENT_EVENT_MAX_ATTEMPTS = int(os.getenv('PAYMENT_EVENT_MAX_ATTEMPTS', '8'))  # Webhook verify attempts before giving up
 STRIPE_PUBLISHABLE_KEY = os.getenv('STRIPE_PUBLISHABLE_KEY', '')
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY', '')
 STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET', '')
 CURRENCY = os.getenv('CURRENCY', 'NGN')
+# Fake gateway (PAYMENT_PROVIDER='fake'): simulated latency and failure rate for load testing
+FAKE_GATEWAY_LATENCY = float(os.getenv('FAKE_GATEWAY_LATENCY', '0'))  # Seconds per gateway call
+FAKE_GATEWAY_FAILURE_RATE = float(os.getenv('FAKE_GATEWAY_FAILURE_RATE', '0'))  # 0.0 - 1.0
+FAKE_GATEWAY_SECRET = os.getenv('FAKE_GATEWAY_SECRET', 'fake-secret')
 
 # Media files (uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+DATA_UPLOAD_MAX_NUMBER_FILES = int(os.getenv('DATA_UPLOAD_MAX_NUMBER_FILES', '300'))  # Files per request; the bulk uploaders send a whole shoot at once
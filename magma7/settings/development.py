@@ -23,6 +23,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # File-backed test database: the default in-memory one uses table
+        # locks, which makes the threaded concurrency tests fail spuriously
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
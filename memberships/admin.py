@@ -1,6 +1,8 @@
-import csv
-from django.contrib import admin
-from django.http import HttpResponse
+from django.contrib import admin, messages
+from core.columnar import ColumnarUnavailable
+from core.exports import iterate, stream_csv
+from core.jobs import background_export_action
+from . import exports
 from .models import Plan, Subscription, PlanFeature, WorkoutLog, WeeklyGoal, WorkoutSession
 
 
@@ -29,30 +31,36 @@ def export_to_csv(modeladmin, request, queryset, fields, filename):
     """
     Generic CSV export function for admin actions
     """
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-    writer = csv.writer(response)
-
-    # Write header
-    writer.writerow(fields)
-
-    # Write data rows
-    for obj in queryset:
-        row = []
-        for field in fields:
-            # Handle nested attributes (e.g., 'user.email')
-            if '.' in field:
-                value = obj
-                for attr in field.split('.'):
-                    value = getattr(value, attr, '')
-                row.append(value)
-            else:
-                value = getattr(obj, field, '')
-                row.append(value)
-        writer.writerow(row)
-
-    return response
+    def rows():
+        for obj in iterate(queryset):
+            row = []
+            for field in fields:
+                # Handle nested attributes (e.g., 'user.email')
+                if '.' in field:
+                    value = obj
+                    for attr in field.split('.'):
+                        value = getattr(value, attr, '')
+                    row.append(value)
+                else:
+                    value = getattr(obj, field, '')
+                    row.append(value)
+            yield row
+
+    return stream_csv(filename, fields, rows())
+
+
+class LiveStatusFilter(admin.SimpleListFilter):
+    """Filter subscriptions by the status derived from today's date."""
+    title = "status"
+    parameter_name = "live_status"
+
+    def lookups(self, request, model_admin):
+        return Subscription.STATUS_CHOICES
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(live_status=self.value())
+        return queryset
 
 
 class PlanFeatureInline(admin.TabularInline):
@@ -86,12 +94,26 @@ class PlanAdmin(admin.ModelAdmin):
 
 @admin.register(Subscription)
 class SubscriptionAdmin(admin.ModelAdmin):
-    list_display = ("user", "plan", "start_date", "end_date", "status", "payment_status", "created_at")
-    list_filter = ("status", "plan", "created_at")
+    list_display = ("user", "plan", "start_date", "end_date", "live_status_display", "payment_status", "created_at")
+    list_filter = (LiveStatusFilter, "plan", "created_at")
     search_fields = ("user__username", "user__email")
     readonly_fields = ("created_at", "updated_at", "payment_info")
     # date_hierarchy = "created_at"  # Disabled due to MySQL timezone tables not being populated
-    actions = ['export_subscriptions_csv']
+    actions = [
+        'export_subscriptions_csv',
+        background_export_action('subscriptions', "Export selected subscriptions in the background"),
+        background_export_action('subscriptions', "Export selected subscriptions in the background (gzip)", compress=True),
+        'export_subscriptions_columnar',
+        background_export_action('subscriptions', "Export selected subscriptions in the background (Parquet/NumPy)", output_format='columnar'),
+    ]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_live_status()
+
+    def live_status_display(self, obj):
+        return obj.get_current_status_display()
+    live_status_display.short_description = "Status"
+    live_status_display.admin_order_field = "live_status"
 
     def payment_status(self, obj):
         if obj.payment:
@@ -107,43 +129,17 @@ class SubscriptionAdmin(admin.ModelAdmin):
 
     def export_subscriptions_csv(self, request, queryset):
         """Export selected subscriptions to CSV"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'subscriptions_export_{timestamp}.csv'
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        writer = csv.writer(response)
-        writer.writerow([
-            'User ID', 'Username', 'Email', 'First Name', 'Last Name',
-            'Plan Name', 'Plan Price', 'Start Date', 'End Date', 'Status',
-            'Days Remaining', 'Payment Reference', 'Payment Status', 'Payment Amount',
-            'Created At'
-        ])
-
-        for sub in queryset:
-            writer.writerow([
-                sub.user.id,
-                sub.user.username,
-                sub.user.email,
-                sub.user.first_name,
-                sub.user.last_name,
-                sub.plan.name,
-                sub.plan.price,
-                sub.start_date,
-                sub.end_date,
-                sub.status,
-                sub.days_remaining,
-                sub.payment.reference if sub.payment else 'N/A',
-                sub.payment.status if sub.payment else 'N/A',
-                f"{sub.payment.amount / 100:.2f}" if sub.payment else 'N/A',
-                sub.created_at,
-            ])
-
-        return response
+        return exports.subscriptions.stream(queryset)
     export_subscriptions_csv.short_description = "Export selected subscriptions to CSV"
 
+    def export_subscriptions_columnar(self, request, queryset):
+        """Export selected subscriptions as Parquet (or NumPy .npz)"""
+        try:
+            return exports.subscriptions.columnar(queryset)
+        except ColumnarUnavailable as e:
+            self.message_user(request, str(e), messages.ERROR)
+    export_subscriptions_columnar.short_description = "Export selected subscriptions (Parquet/NumPy)"
+
 
 @admin.register(WorkoutLog)
 class WorkoutLogAdmin(admin.ModelAdmin):
@@ -152,39 +148,27 @@ class WorkoutLogAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "user__email", "notes")
     # date_hierarchy = "date"  # Disabled due to MySQL timezone tables not being populated
     readonly_fields = ("created_at",)
-    actions = ['export_workout_logs_csv']
+    actions = [
+        'export_workout_logs_csv',
+        background_export_action('workout_logs', "Export selected workout logs in the background"),
+        background_export_action('workout_logs', "Export selected workout logs in the background (gzip)", compress=True),
+        'export_workout_logs_columnar',
+        background_export_action('workout_logs', "Export selected workout logs in the background (Parquet/NumPy)", output_format='columnar'),
+    ]
 
     def export_workout_logs_csv(self, request, queryset):
         """Export selected workout logs to CSV"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'workout_logs_export_{timestamp}.csv'
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        writer = csv.writer(response)
-        writer.writerow([
-            'User ID', 'Username', 'Email', 'Workout Type', 'Duration (min)',
-            'Calories Burned', 'Date', 'Notes', 'Created At'
-        ])
-
-        for log in queryset:
-            writer.writerow([
-                log.user.id,
-                log.user.username,
-                log.user.email,
-                log.get_workout_type_display(),
-                log.duration,
-                log.calories or 'N/A',
-                log.date,
-                log.notes,
-                log.created_at,
-            ])
-
-        return response
+        return exports.workout_logs.stream(queryset)
     export_workout_logs_csv.short_description = "Export selected workout logs to CSV"
 
+    def export_workout_logs_columnar(self, request, queryset):
+        """Export selected workout logs as Parquet (or NumPy .npz)"""
+        try:
+            return exports.workout_logs.columnar(queryset)
+        except ColumnarUnavailable as e:
+            self.message_user(request, str(e), messages.ERROR)
+    export_workout_logs_columnar.short_description = "Export selected workout logs (Parquet/NumPy)"
+
 
 @admin.register(WeeklyGoal)
 class WeeklyGoalAdmin(admin.ModelAdmin):
@@ -193,7 +177,11 @@ class WeeklyGoalAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "user__email")
     # date_hierarchy = "week_start"  # Disabled due to MySQL timezone tables not being populated
     readonly_fields = ("created_at",)
-    actions = ['export_weekly_goals_csv']
+    actions = [
+        'export_weekly_goals_csv',
+        background_export_action('weekly_goals', "Export selected weekly goals in the background"),
+        background_export_action('weekly_goals', "Export selected weekly goals in the background (gzip)", compress=True),
+    ]
 
     def is_active_icon(self, obj):
         return _to_bool(getattr(obj, "is_active", False))
@@ -204,34 +192,7 @@ class WeeklyGoalAdmin(admin.ModelAdmin):
 
     def export_weekly_goals_csv(self, request, queryset):
         """Export selected weekly goals to CSV"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'weekly_goals_export_{timestamp}.csv'
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        writer = csv.writer(response)
-        writer.writerow([
-            'User ID', 'Username', 'Email', 'Goal Type', 'Target Value',
-            'Current Progress', 'Progress %', 'Week Start', 'Is Active', 'Created At'
-        ])
-
-        for goal in queryset:
-            writer.writerow([
-                goal.user.id,
-                goal.user.username,
-                goal.user.email,
-                goal.get_goal_type_display(),
-                goal.target_value,
-                goal.current_progress,
-                goal.progress_percentage,
-                goal.week_start,
-                'Yes' if goal.is_active else 'No',
-                goal.created_at,
-            ])
-
-        return response
+        return exports.weekly_goals.stream(queryset)
     export_weekly_goals_csv.short_description = "Export selected weekly goals to CSV"
 
 
@@ -242,37 +203,13 @@ class WorkoutSessionAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "user__email", "title", "trainer")
     # date_hierarchy = "session_date"  # Disabled due to MySQL timezone tables not being populated
     readonly_fields = ("created_at",)
-    actions = ['export_workout_sessions_csv']
+    actions = [
+        'export_workout_sessions_csv',
+        background_export_action('workout_sessions', "Export selected workout sessions in the background"),
+        background_export_action('workout_sessions', "Export selected workout sessions in the background (gzip)", compress=True),
+    ]
 
     def export_workout_sessions_csv(self, request, queryset):
         """Export selected workout sessions to CSV"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'workout_sessions_export_{timestamp}.csv'
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        writer = csv.writer(response)
-        writer.writerow([
-            'User ID', 'Username', 'Email', 'Session Title', 'Workout Type',
-            'Session Date', 'Session Time', 'Duration (min)', 'Trainer', 'Notes', 'Created At'
-        ])
-
-        for session in queryset:
-            writer.writerow([
-                session.user.id,
-                session.user.username,
-                session.user.email,
-                session.title,
-                session.get_workout_type_display(),
-                session.session_date,
-                session.session_time,
-                session.duration,
-                session.trainer or 'N/A',
-                session.notes,
-                session.created_at,
-            ])
-
-        return response
+        return exports.workout_sessions.stream(queryset)
     export_workout_sessions_csv.short_description = "Export selected workout sessions to CSV"
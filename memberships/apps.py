@@ -5,3 +5,5 @@ class MembershipsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'memberships'
 
+    def ready(self):
+        from . import signals  # noqa: F401
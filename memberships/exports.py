@@ -0,0 +1,150 @@
+"""
+Export definitions for membership data, used by the admin CSV actions and
+background export jobs.
+"""
+from core.columnar import Column
+from core.exports import Exporter, register
+
+
+def _subscription_row(sub):
+    return [
+        sub.user.id,
+        sub.user.username,
+        sub.user.email,
+        sub.user.first_name,
+        sub.user.last_name,
+        sub.plan.name,
+        sub.plan.price,
+        sub.start_date,
+        sub.end_date,
+        sub.current_status,
+        sub.days_remaining,
+        sub.payment.reference if sub.payment else 'N/A',
+        sub.payment.status if sub.payment else 'N/A',
+        f"{sub.payment.amount / 100:.2f}" if sub.payment else 'N/A',
+        sub.created_at,
+    ]
+
+
+subscriptions = register(Exporter(
+    name='subscriptions',
+    label='Subscriptions',
+    model='memberships.Subscription',
+    header=[
+        'User ID', 'Username', 'Email', 'First Name', 'Last Name',
+        'Plan Name', 'Plan Price', 'Start Date', 'End Date', 'Status',
+        'Days Remaining', 'Payment Reference', 'Payment Status', 'Payment Amount',
+        'Created At'
+    ],
+    row=_subscription_row,
+    prepare=lambda queryset: queryset.select_related('user', 'plan', 'payment').with_live_status(),
+    columns=[
+        Column('subscription_id', 'id', 'int'),
+        Column('user_id', 'user_id', 'int'),
+        Column('username', 'user__username', 'str'),
+        Column('plan', 'plan__name', 'str'),
+        Column('plan_price', 'plan__price', 'float'),
+        Column('start_date', 'start_date', 'date'),
+        Column('end_date', 'end_date', 'date'),
+        Column('status', 'live_status', 'str'),
+        Column('payment_reference', 'payment__reference', 'str'),
+        Column('payment_status', 'payment__status', 'str'),
+        Column('payment_amount_minor', 'payment__amount', 'int'),  # kobo/cents, null without a payment
+        Column('created_at', 'created_at', 'datetime'),
+    ],
+))
+
+
+def _workout_log_row(log):
+    return [
+        log.user.id,
+        log.user.username,
+        log.user.email,
+        log.get_workout_type_display(),
+        log.duration,
+        log.calories or 'N/A',
+        log.date,
+        log.notes,
+        log.created_at,
+    ]
+
+
+workout_logs = register(Exporter(
+    name='workout_logs',
+    label='Workout logs',
+    model='memberships.WorkoutLog',
+    header=[
+        'User ID', 'Username', 'Email', 'Workout Type', 'Duration (min)',
+        'Calories Burned', 'Date', 'Notes', 'Created At'
+    ],
+    row=_workout_log_row,
+    prepare=lambda queryset: queryset.select_related('user'),
+    # Free-text notes are left out of the columnar format; use CSV for those
+    columns=[
+        Column('log_id', 'id', 'int'),
+        Column('user_id', 'user_id', 'int'),
+        Column('username', 'user__username', 'str'),
+        Column('workout_type', 'workout_type', 'str'),
+        Column('duration_min', 'duration', 'int'),
+        Column('calories', 'calories', 'int'),
+        Column('date', 'date', 'date'),
+        Column('created_at', 'created_at', 'datetime'),
+    ],
+))
+
+
+def _weekly_goal_row(goal):
+    return [
+        goal.user.id,
+        goal.user.username,
+        goal.user.email,
+        goal.get_goal_type_display(),
+        goal.target_value,
+        goal.current_progress,
+        goal.progress_percentage,
+        goal.week_start,
+        'Yes' if goal.is_active else 'No',
+        goal.created_at,
+    ]
+
+
+weekly_goals = register(Exporter(
+    name='weekly_goals',
+    label='Weekly goals',
+    model='memberships.WeeklyGoal',
+    header=[
+        'User ID', 'Username', 'Email', 'Goal Type', 'Target Value',
+        'Current Progress', 'Progress %', 'Week Start', 'Is Active', 'Created At'
+    ],
+    row=_weekly_goal_row,
+    prepare=lambda queryset: queryset.select_related('user').with_progress(),
+))
+
+
+def _workout_session_row(session):
+    return [
+        session.user.id,
+        session.user.username,
+        session.user.email,
+        session.title,
+        session.get_workout_type_display(),
+        session.session_date,
+        session.session_time,
+        session.duration,
+        session.trainer or 'N/A',
+        session.notes,
+        session.created_at,
+    ]
+
+
+workout_sessions = register(Exporter(
+    name='workout_sessions',
+    label='Workout sessions',
+    model='memberships.WorkoutSession',
+    header=[
+        'User ID', 'Username', 'Email', 'Session Title', 'Workout Type',
+        'Session Date', 'Session Time', 'Duration (min)', 'Trainer', 'Notes', 'Created At'
+    ],
+    row=_workout_session_row,
+    prepare=lambda queryset: queryset.select_related('user'),
+))
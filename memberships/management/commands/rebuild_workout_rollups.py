@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from memberships.rollups import rebuild_rollups
+from memberships.streaks import refresh_streak
+from users.models import MemberProfile
+
+
+class Command(BaseCommand):
+    help = "Backfill or rebuild the daily workout rollup table and stored streaks from WorkoutLog."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild rollups for this username')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            User = get_user_model()
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist.")
+
+        count = rebuild_rollups(user=user, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} daily rollup(s)."))
+
+        profiles = MemberProfile.objects.all()
+        if user is not None:
+            profiles = profiles.filter(user=user)
+        streaks = 0
+        for user_id in profiles.values_list('user_id', flat=True):
+            refresh_streak(user_id)
+            streaks += 1
+        self.stdout.write(self.style.SUCCESS(f"Recomputed {streaks} streak(s)."))
@@ -1,50 +1,99 @@
 from datetime import timedelta
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
 from memberships.models import Subscription
-from notifications.utils import notify_user
+from notifications.mail_queue import queue_enabled
+from notifications.utils import NotificationMessage, notify_users
 
 
 REMINDER_WINDOWS = {7, 3, 1, 0}
 
 
+def due_reminders(today):
+    """
+    Subscriptions ending in one of the reminder windows that were not yet
+    reminded for it. Cancelled subscriptions get no renewal reminders.
+    """
+    due = Q()
+    for days in REMINDER_WINDOWS:
+        due |= Q(end_date=today + timedelta(days=days)) & (
+            Q(last_reminder_days__isnull=True) | ~Q(last_reminder_days=days)
+        )
+    return Subscription.objects.filter(due).exclude(status='cancelled').select_related('user', 'plan')
+
+
+def reminder_message(sub, days_remaining):
+    name = sub.user.first_name or sub.user.username
+    if days_remaining > 0:
+        title = f"Your {sub.plan.name} plan expires in {days_remaining} day(s)"
+        body = (
+            f"Hi {name}, your {sub.plan.name} plan "
+            f"will expire on {sub.end_date}. Renew to stay active."
+        )
+    else:
+        title = f"Your {sub.plan.name} plan expires today"
+        body = (
+            f"Hi {name}, your {sub.plan.name} plan "
+            f"expires today ({sub.end_date}). Renew to avoid interruption."
+        )
+    return title, body
+
+
 class Command(BaseCommand):
     help = "Send membership expiry reminders via email and in-app notifications."
 
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Emails per SMTP batch')
+
     def handle(self, *args, **options):
         today = timezone.localdate()
-        count = 0
-        for sub in Subscription.objects.select_related('user', 'plan').all():
-            # Refresh status
-            previous_status = sub.status
-            sub.save()  # updates status based on dates
+
+        updated = Subscription.objects.refresh_status(today)
+        self.stdout.write(
+            "Refreshed statuses: " + ", ".join(f"{count} {status}" for status, count in updated.items())
+        )
+
+        subs = list(due_reminders(today))
+        if not subs:
+            self.stdout.write(self.style.SUCCESS("Sent 0 reminders."))
+            return
+
+        messages = []
+        reminded = {}
+        for sub in subs:
             days_remaining = (sub.end_date - today).days
+            title, body = reminder_message(sub, days_remaining)
+            messages.append((sub.user, title, body))
+            reminded.setdefault(days_remaining, []).append(sub.pk)
 
-            if days_remaining in REMINDER_WINDOWS:
-                if sub.last_reminder_days != days_remaining:
-                    if days_remaining > 0:
-                        title = f"Your {{sub.plan.name}} plan expires in {days_remaining} day(s)"
-                        body = (
-                            f"Hi {sub.user.first_name or sub.user.username}, your {sub.plan.name} plan "
-                            f"will expire on {sub.end_date}. Renew to stay active."
-                        )
-                    elif days_remaining == 0:
-                        title = f"Your {sub.plan.name} plan expires today"
-                        body = (
-                            f"Hi {sub.user.first_name or sub.user.username}, your {sub.plan.name} plan "
-                            f"expires today ({sub.end_date}). Renew to avoid interruption."
-                        )
-                    else:
-                        title = f"Your {sub.plan.name} plan has expired"
-                        body = (
-                            f"Hi {sub.user.first_name or sub.user.username}, your {sub.plan.name} plan expired on "
-                            f"{sub.end_date}. Renew anytime to reactivate."
-                        )
-                    notify_user(sub.user, title=title, body=body, email=True, in_app=True)
-                    sub.last_reminder_days = days_remaining
-                    sub.save(update_fields=["last_reminder_days", "updated_at", "status", "end_date", "start_date"])
-                    count += 1
-
-        self.stdout.write(self.style.SUCCESS(f"Sent {count} reminders."))
+        queue = queue_enabled()
+        with transaction.atomic():
+            # In-app rows, queued emails and the reminder markers commit
+            # together, so a crash in between can't send duplicates next run
+            result = notify_users(
+                [NotificationMessage(user, title, body, email=queue) for user, title, body in messages],
+                batch_size=options['batch_size'],
+                queue=queue,
+            )
+            for days_remaining, pks in reminded.items():
+                Subscription.objects.filter(pk__in=pks).update(
+                    last_reminder_days=days_remaining, updated_at=timezone.now()
+                )
+        if not queue:
+            # Direct SMTP delivery happens only once the reminders are recorded
+            result = notify_users(
+                [NotificationMessage(user, title, body, in_app=False) for user, title, body in messages],
+                batch_size=options['batch_size'],
+                queue=False,
+            )
 
+        for error in result.errors:
+            self.stderr.write(
+                f"Email batch {error.batch} failed ({len(error.recipients)} recipient(s)): {error.error}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {len(messages)} reminders ({result.emails_sent} email(s) sent, {result.emails_queued} queued)."
+        ))
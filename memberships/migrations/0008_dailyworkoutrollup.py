@@ -0,0 +1,57 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    WorkoutLog = apps.get_model('memberships', 'WorkoutLog')
+    DailyWorkoutRollup = apps.get_model('memberships', 'DailyWorkoutRollup')
+
+    days = {}
+    grouped = (
+        WorkoutLog.objects.order_by()
+        .values('user_id', 'date', 'workout_type')
+        .annotate(count=Count('id'), duration=Sum('duration'), calories=Sum('calories'))
+    )
+    for row in grouped:
+        key = (row['user_id'], row['date'])
+        day = days.setdefault(key, DailyWorkoutRollup(
+            user_id=row['user_id'], date=row['date'], type_counts={},
+        ))
+        day.workout_count += row['count']
+        day.total_duration += row['duration'] or 0
+        day.total_calories += row['calories'] or 0
+        day.type_counts[row['workout_type']] = row['count']
+    DailyWorkoutRollup.objects.bulk_create(days.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memberships', '0007_subscription_payment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyWorkoutRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('workout_count', models.PositiveIntegerField(default=0)),
+                ('total_duration', models.PositiveIntegerField(default=0, help_text='Total minutes')),
+                ('total_calories', models.PositiveIntegerField(default=0)),
+                ('type_counts', models.JSONField(blank=True, default=dict, help_text='Workout count per workout type')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workout_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
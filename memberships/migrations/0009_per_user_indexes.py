@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memberships', '0008_dailyworkoutrollup'),
+        ('payments', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['user', '-created_at'], name='sub_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['user', '-end_date'], name='sub_user_end_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weeklygoal',
+            index=models.Index(fields=['user', 'week_start', 'is_active'], name='goal_user_week_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workoutlog',
+            index=models.Index(fields=['user', '-date', '-created_at'], name='workoutlog_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workoutsession',
+            index=models.Index(fields=['user', 'session_date', 'session_time'], name='session_user_date_idx'),
+        ),
+    ]
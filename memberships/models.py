@@ -1,6 +1,7 @@
 from datetime import timedelta
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 
@@ -57,6 +58,48 @@ class PlanFeature(models.Model):
         return f"{self.plan.name}: {self.text}"
 
 
+class SubscriptionQuerySet(models.QuerySet):
+    def with_live_status(self, today=None):
+        """
+        Annotate ``live_status`` computed from the date range in SQL, so reads
+        never depend on the stored status having been refreshed.
+        Cancelled subscriptions keep their stored status.
+        """
+        today = today or timezone.localdate()
+        return self.annotate(
+            live_status=models.Case(
+                models.When(status='cancelled', then=models.Value('cancelled')),
+                models.When(end_date__lt=today, then=models.Value('expired')),
+                models.When(start_date__gt=today, then=models.Value('upcoming')),
+                default=models.Value('active'),
+                output_field=models.CharField(max_length=12),
+            )
+        )
+
+    def live(self, status, today=None):
+        """Filter on the date-derived status, e.g. ``live('active')``."""
+        return self.with_live_status(today).filter(live_status=status)
+
+    def refresh_status(self, today=None):
+        """
+        Bring the stored status column in line with the date range using one
+        UPDATE per status, touching only rows that are out of date.
+        Returns a dict of ``{status: rows_updated}``.
+        """
+        today = today or timezone.localdate()
+        now = timezone.now()
+        stale = self.exclude(status='cancelled')
+        ranges = {
+            'expired': models.Q(end_date__lt=today),
+            'upcoming': models.Q(start_date__gt=today, end_date__gte=today),
+            'active': models.Q(start_date__lte=today, end_date__gte=today),
+        }
+        return {
+            status: stale.filter(condition).exclude(status=status).update(status=status, updated_at=now)
+            for status, condition in ranges.items()
+        }
+
+
 class Subscription(models.Model):
     STATUS_CHOICES = (
         ("active", "Active"),
@@ -75,8 +118,15 @@ class Subscription(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     last_reminder_days = models.IntegerField(null=True, blank=True)
 
+    objects = SubscriptionQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='sub_user_created_idx'),
+            models.Index(fields=['user', '-end_date'], name='sub_user_end_date_idx'),
+            models.Index(fields=['end_date'], name='sub_end_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.plan} ({self.status})"
@@ -95,6 +145,26 @@ class Subscription(models.Model):
             self.status = 'active'
         super().save(*args, **kwargs)
 
+    @property
+    def current_status(self):
+        """
+        Status derived from today's date. Uses the ``live_status`` annotation
+        when present, otherwise computes it without touching the database.
+        """
+        if hasattr(self, 'live_status'):
+            return self.live_status
+        if self.status == 'cancelled':
+            return 'cancelled'
+        today = timezone.localdate()
+        if self.end_date < today:
+            return 'expired'
+        if self.start_date > today:
+            return 'upcoming'
+        return 'active'
+
+    def get_current_status_display(self):
+        return dict(self.STATUS_CHOICES).get(self.current_status, self.current_status)
+
     @property
     def days_remaining(self):
         today = timezone.localdate()
@@ -126,10 +196,63 @@ class WorkoutLog(models.Model):
 
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['user', '-date', '-created_at'], name='workoutlog_user_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.get_workout_type_display()} ({self.date})"
 
+    def save(self, *args, **kwargs):
+        # The post_save signal refreshes the day's rollup; keep it in the same transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class DailyWorkoutRollup(models.Model):
+    """Per-user, per-day workout totals maintained from WorkoutLog."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='workout_rollups')
+    date = models.DateField()
+    workout_count = models.PositiveIntegerField(default=0)
+    total_duration = models.PositiveIntegerField(default=0, help_text='Total minutes')
+    total_calories = models.PositiveIntegerField(default=0)
+    type_counts = models.JSONField(default=dict, blank=True, help_text='Workout count per workout type')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        unique_together = ('user', 'date')
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date}: {self.workout_count} workout(s)"
+
+
+class WeeklyGoalQuerySet(models.QuerySet):
+    def with_progress(self):
+        """
+        Annotate each goal with ``annotated_progress`` (workout count, minutes
+        or calories for its week, depending on goal_type) in the same query.
+        """
+        week_logs = WorkoutLog.objects.filter(
+            user=models.OuterRef('user'),
+            date__gte=models.OuterRef('week_start'),
+            date__lt=models.ExpressionWrapper(
+                models.OuterRef('week_start') + timedelta(days=7),
+                output_field=models.DateField(),
+            ),
+        ).order_by().values('user')
+
+        def total(aggregate):
+            return Coalesce(models.Subquery(week_logs.annotate(total=aggregate).values('total')), 0)
+
+        return self.annotate(annotated_progress=models.Case(
+            models.When(goal_type='workouts', then=total(models.Count('id'))),
+            models.When(goal_type='duration', then=total(models.Sum('duration'))),
+            models.When(goal_type='calories', then=total(models.Sum('calories'))),
+            default=models.Value(0),
+            output_field=models.IntegerField(),
+        ))
+
 
 class WeeklyGoal(models.Model):
     GOAL_TYPE_CHOICES = (
@@ -145,8 +268,13 @@ class WeeklyGoal(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = WeeklyGoalQuerySet.as_manager()
+
     class Meta:
         ordering = ['-week_start', '-created_at']
+        indexes = [
+            models.Index(fields=['user', 'week_start', 'is_active'], name='goal_user_week_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.get_goal_type_display()}: {self.target_value}"
@@ -154,6 +282,10 @@ class WeeklyGoal(models.Model):
     @property
     def current_progress(self):
         """Calculate current progress towards the goal"""
+        annotated = getattr(self, 'annotated_progress', None)
+        if annotated is not None:
+            return annotated
+
         week_end = self.week_start + timedelta(days=7)
         workouts = WorkoutLog.objects.filter(
             user=self.user,
@@ -199,6 +331,9 @@ class WorkoutSession(models.Model):
 
     class Meta:
         ordering = ['session_date', 'session_time']
+        indexes = [
+            models.Index(fields=['user', 'session_date', 'session_time'], name='session_user_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.title} ({self.session_date})"
@@ -0,0 +1,51 @@
+"""
+Keyset (cursor) pagination for workout history.
+
+Pages are ordered by ``(date, created_at, id)`` descending and each page
+continues strictly after the last row of the previous one, so fetching a
+deep page costs the same as the first and never needs an OFFSET.
+"""
+import base64
+from datetime import date, datetime
+
+from django.db.models import Q
+
+WORKOUT_ORDERING = ('-date', '-created_at', '-id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(workout):
+    raw = f"{workout.date.isoformat()}|{workout.created_at.isoformat()}|{workout.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        day, created_at, pk = raw.split('|')
+        return date.fromisoformat(day), datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor(str(e)) from e
+
+
+def paginate_workouts(queryset, cursor=None, page_size=20):
+    """
+    Return ``(workouts, next_cursor)`` for the page after ``cursor``.
+
+    ``next_cursor`` is None on the last page.
+    """
+    queryset = queryset.order_by(*WORKOUT_ORDERING)
+    if cursor:
+        day, created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(date__lt=day)
+            | Q(date=day, created_at__lt=created_at)
+            | Q(date=day, created_at=created_at, pk__lt=pk)
+        )
+    rows = list(queryset[:page_size + 1])
+    workouts = rows[:page_size]
+    next_cursor = encode_cursor(workouts[-1]) if len(rows) > page_size else None
+    return workouts, next_cursor
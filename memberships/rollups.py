@@ -0,0 +1,93 @@
+"""
+Maintenance of the DailyWorkoutRollup table.
+
+Each rollup row is recomputed from that day's WorkoutLog rows whenever one
+of them changes, so the table stays exact without incremental arithmetic.
+The WorkoutLog signals run the recompute inside the transaction that saves
+or deletes the log (WorkoutLog.save() opens one), so a rollup can never
+disagree with committed logs. The (user, date) rollup row is created if
+needed and locked first, which serialises concurrent writers for the same
+day. rebuild_rollups() regenerates the whole table (or one member's rows).
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import DailyWorkoutRollup, WorkoutLog
+
+
+def refresh_daily_rollup(user_id, date):
+    """Recompute the rollup row for one member and day, in the caller's transaction."""
+    with transaction.atomic():
+        # Make sure the row exists, then lock it; a second writer for the
+        # same day waits here until the first one commits
+        DailyWorkoutRollup.objects.bulk_create(
+            [DailyWorkoutRollup(user_id=user_id, date=date)], ignore_conflicts=True
+        )
+        rollup = DailyWorkoutRollup.objects.select_for_update().get(user_id=user_id, date=date)
+
+        # A locking read sees the latest committed logs, not an older snapshot
+        logs = (
+            WorkoutLog.objects.select_for_update().filter(user_id=user_id, date=date)
+            .order_by().values_list('workout_type', 'duration', 'calories')
+        )
+        type_counts = {}
+        duration = calories = 0
+        for workout_type, log_duration, log_calories in logs:
+            type_counts[workout_type] = type_counts.get(workout_type, 0) + 1
+            duration += log_duration or 0
+            calories += log_calories or 0
+
+        if not type_counts:
+            rollup.delete()
+            return None
+
+        rollup.workout_count = sum(type_counts.values())
+        rollup.total_duration = duration
+        rollup.total_calories = calories
+        rollup.type_counts = type_counts
+        rollup.save(update_fields=['workout_count', 'total_duration', 'total_calories', 'type_counts', 'updated_at'])
+        return rollup
+
+
+def rebuild_rollups(user=None, batch_size=1000):
+    """
+    Regenerate rollups from WorkoutLog, for every member or just ``user``.
+
+    Returns the number of rollup rows written.
+    """
+    logs = WorkoutLog.objects.all()
+    rollups = DailyWorkoutRollup.objects.all()
+    if user is not None:
+        logs = logs.filter(user=user)
+        rollups = rollups.filter(user=user)
+
+    grouped = (
+        logs.order_by()
+        .values('user_id', 'date', 'workout_type')
+        .annotate(count=Count('id'), duration=Sum('duration'), calories=Sum('calories'))
+    )
+    days = defaultdict(lambda: {'count': 0, 'duration': 0, 'calories': 0, 'types': {}})
+    for row in grouped.iterator():
+        day = days[(row['user_id'], row['date'])]
+        day['count'] += row['count']
+        day['duration'] += row['duration'] or 0
+        day['calories'] += row['calories'] or 0
+        day['types'][row['workout_type']] = row['count']
+
+    objs = [
+        DailyWorkoutRollup(
+            user_id=user_id,
+            date=date,
+            workout_count=day['count'],
+            total_duration=day['duration'],
+            total_calories=day['calories'],
+            type_counts=day['types'],
+        )
+        for (user_id, date), day in days.items()
+    ]
+    with transaction.atomic():
+        rollups.delete()
+        DailyWorkoutRollup.objects.bulk_create(objs, batch_size=batch_size)
+    return len(objs)
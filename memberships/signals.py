@@ -0,0 +1,64 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from users.models import MemberProfile
+
+from .models import Subscription, WorkoutLog
+from .rollups import refresh_daily_rollup
+from .streaks import record_workout, refresh_streak
+from .subscriptions import sync_current_subscription
+
+
+@receiver(pre_save, sender=WorkoutLog)
+def remember_previous_day(sender, instance, **kwargs):
+    # An edit may move a workout to another day; keep the old day to refresh it too
+    instance._previous_day = None
+    if instance.pk:
+        instance._previous_day = (
+            WorkoutLog.objects.filter(pk=instance.pk).values_list('user_id', 'date').first()
+        )
+
+
+@receiver(post_save, sender=WorkoutLog)
+def update_rollup_on_save(sender, instance, **kwargs):
+    current = (instance.user_id, instance.date)
+    refresh_daily_rollup(*current)
+    previous = getattr(instance, '_previous_day', None)
+    if previous and previous != current:
+        refresh_daily_rollup(*previous)
+
+
+@receiver(post_save, sender=WorkoutLog)
+def update_streak_on_save(sender, instance, created, **kwargs):
+    if created:
+        record_workout(instance.user, instance.date)
+    else:
+        # The date may have moved or the member changed; recompute both sides
+        previous = getattr(instance, '_previous_day', None)
+        refresh_streak(instance.user_id)
+        if previous and previous[0] != instance.user_id:
+            refresh_streak(previous[0])
+
+
+@receiver(post_delete, sender=WorkoutLog)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    refresh_daily_rollup(instance.user_id, instance.date)
+
+
+@receiver(post_delete, sender=WorkoutLog)
+def update_streak_on_delete(sender, instance, **kwargs):
+    refresh_streak(instance.user_id)
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def update_current_subscription(sender, instance, **kwargs):
+    sync_current_subscription(instance.user_id)
+
+
+@receiver(post_save, sender=MemberProfile)
+def fill_current_subscription(sender, instance, created, **kwargs):
+    # Profiles created after the member subscribed (legacy accounts, lazy
+    # get_or_create) start with an empty pointer; fill it in from the history
+    if created and instance.current_subscription_id is None:
+        instance.current_subscription_id, instance.active_until = sync_current_subscription(instance.user_id)
@@ -0,0 +1,67 @@
+"""
+Workout statistics for the member dashboard and activity pages.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .models import DailyWorkoutRollup
+
+
+@dataclass(frozen=True)
+class DashboardStats:
+    calories_this_week: int = 0
+    workouts_this_month: int = 0
+    total_duration: int = 0
+
+    @property
+    def total_hours(self):
+        return round(self.total_duration / 60, 1)
+
+
+def get_dashboard_stats(user, today=None):
+    """
+    Compute the dashboard workout figures for ``user`` in a single
+    conditional-aggregation query over the member's daily rollups.
+    """
+    today = today or timezone.localdate()
+    week_start = today - timedelta(days=7)
+    month_start = today - timedelta(days=30)
+
+    totals = DailyWorkoutRollup.objects.filter(user=user).aggregate(
+        calories_this_week=Sum('total_calories', filter=Q(date__gte=week_start)),
+        workouts_this_month=Sum('workout_count', filter=Q(date__gte=month_start)),
+        total_duration=Sum('total_duration'),
+    )
+    return DashboardStats(
+        calories_this_week=totals['calories_this_week'] or 0,
+        workouts_this_month=totals['workouts_this_month'] or 0,
+        total_duration=totals['total_duration'] or 0,
+    )
+
+
+@dataclass(frozen=True)
+class LifetimeTotals:
+    workouts: int = 0
+    duration: int = 0
+    calories: int = 0
+
+    @property
+    def hours(self):
+        return round(self.duration / 60, 1)
+
+
+def get_lifetime_totals(user):
+    """Return the member's all-time workout totals from the daily rollups."""
+    totals = DailyWorkoutRollup.objects.filter(user=user).aggregate(
+        workouts=Sum('workout_count'),
+        duration=Sum('total_duration'),
+        calories=Sum('total_calories'),
+    )
+    return LifetimeTotals(
+        workouts=totals['workouts'] or 0,
+        duration=totals['duration'] or 0,
+        calories=totals['calories'] or 0,
+    )
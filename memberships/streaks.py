@@ -0,0 +1,96 @@
+"""
+Workout streak engine.
+
+A streak is the number of consecutive days, ending today, on which the
+member logged at least one workout. The value is stored on MemberProfile
+and kept current by the WorkoutLog signals: a new workout advances it
+incrementally (record_workout), while edits and deletes recompute it
+(refresh_streak). compute_streak() is the full recomputation also used for
+backdated entries and backfills. Future-dated workouts don't count until
+their day comes.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from users.models import MemberProfile
+from .models import WorkoutLog
+
+
+def compute_streak(user, today=None):
+    """
+    Return ``(streak, last_workout_date)`` for ``user`` as of ``today``.
+
+    Fetches the distinct workout dates newest-first in one query and walks
+    them in memory until the first gap.
+    """
+    today = today or timezone.localdate()
+    dates = (
+        WorkoutLog.objects.filter(user=user, date__lte=today)
+        .order_by('-date')
+        .values_list('date', flat=True)
+        .distinct()
+    )
+    streak = 0
+    last_date = None
+    expected = None
+    for workout_date in dates:
+        if last_date is None:
+            last_date = expected = workout_date
+        if workout_date != expected:
+            break
+        streak += 1
+        expected = workout_date - timedelta(days=1)
+    return streak, last_date
+
+
+def _get_profile(user):
+    profile, _ = MemberProfile.objects.get_or_create(user=user)
+    return profile
+
+
+def recompute_streak(user, today=None):
+    """Recompute and persist the stored streak from the workout history."""
+    profile = _get_profile(user)
+    profile.current_streak, profile.last_workout_date = compute_streak(user, today=today)
+    profile.save(update_fields=['current_streak', 'last_workout_date'])
+    return profile
+
+
+def refresh_streak(user_id, today=None):
+    """
+    Recompute the stored streak for a member by id. Only updates an
+    existing profile, so it is safe while a member is being deleted.
+    """
+    streak, last_date = compute_streak(user_id, today=today)
+    MemberProfile.objects.filter(user_id=user_id).update(current_streak=streak, last_workout_date=last_date)
+
+
+def record_workout(user, workout_date, today=None):
+    """Advance the stored streak for a workout logged on ``workout_date``."""
+    profile = _get_profile(user)
+    if workout_date > (today or timezone.localdate()):
+        # Not part of the streak until that day; compute_streak ignores it too
+        return profile
+    last = profile.last_workout_date
+    if last == workout_date:
+        return profile
+    if last is not None and workout_date < last:
+        # Backdated entry may bridge a gap; fall back to a full recompute
+        return recompute_streak(user, today=today)
+    if last == workout_date - timedelta(days=1):
+        profile.current_streak += 1
+    else:
+        profile.current_streak = 1
+    profile.last_workout_date = workout_date
+    profile.save(update_fields=['current_streak', 'last_workout_date'])
+    return profile
+
+
+def get_current_streak(user, today=None):
+    """Return the member's streak as of ``today`` from the stored profile fields."""
+    today = today or timezone.localdate()
+    profile = _get_profile(user)
+    if profile.last_workout_date == today:
+        return profile.current_streak
+    return 0
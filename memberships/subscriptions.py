@@ -0,0 +1,52 @@
+"""
+Maintained pointer from a member's profile to their current subscription.
+
+MemberProfile.current_subscription is the member's most recently created
+subscription and MemberProfile.active_until the latest end date across all of
+them. Both are refreshed whenever a subscription is saved or deleted, and
+filled in when a profile is created for a member who already has
+subscriptions, so reading a member's current plan never needs a sort over
+their history.
+Expiry needs no write: the status is derived from the dates on read.
+"""
+from django.db.models import Max
+
+from users.models import MemberProfile
+
+from .models import Subscription
+
+
+def sync_current_subscription(user_id):
+    """
+    Recompute the profile pointer and ``active_until`` for one member.
+    Returns the (current_subscription_id, active_until) written.
+    """
+    subs = Subscription.objects.filter(user_id=user_id)
+    current_id = subs.order_by('-created_at', '-pk').values_list('pk', flat=True).first()
+    active_until = subs.aggregate(latest=Max('end_date'))['latest']
+    MemberProfile.objects.filter(user_id=user_id).update(
+        current_subscription_id=current_id,
+        active_until=active_until,
+    )
+    return current_id, active_until
+
+
+def get_current_subscription(user):
+    """Return the member's current subscription (with its plan), or None."""
+    profile = (
+        MemberProfile.objects.select_related('current_subscription__plan')
+        .filter(user=user)
+        .first()
+    )
+    if profile is None:
+        # No profile row (legacy account); fall back to the history
+        return Subscription.objects.filter(user=user).select_related('plan').order_by('-created_at').first()
+    return profile.current_subscription
+
+
+def get_active_until(user):
+    """Return the latest end date across the member's subscriptions, or None."""
+    row = MemberProfile.objects.filter(user=user).values_list('active_until').first()
+    if row is not None:
+        return row[0]
+    return Subscription.objects.filter(user=user).aggregate(latest=Max('end_date'))['latest']
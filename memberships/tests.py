@@ -0,0 +1,301 @@
+import threading
+import unittest
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from notifications.models import Notification
+from users.models import MemberProfile
+
+from .models import DailyWorkoutRollup, Plan, Subscription, WeeklyGoal, WorkoutLog, WorkoutSession
+from .pagination import WORKOUT_ORDERING, InvalidCursor, paginate_workouts
+from .streaks import get_current_streak
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN output checked is SQLite specific')
+class PerUserIndexTests(TestCase):
+    """The per-user query shapes used by the views are served by the composite indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('indexed', 'indexed@example.com', 'secret')
+        cls.today = timezone.localdate()
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertRegex(plan, rf'USING (COVERING )?INDEX {index_name}\b', plan)
+        self.assertNotRegex(plan, r'\bSCAN\b', plan)
+
+    def test_subscription_history(self):
+        self.assertUsesIndex(Subscription.objects.filter(user=self.user).order_by('-created_at'), 'sub_user_created_idx')
+
+    def test_subscription_latest_end_date(self):
+        self.assertUsesIndex(Subscription.objects.filter(user=self.user).order_by('-end_date'), 'sub_user_end_date_idx')
+
+    def test_workout_log_history(self):
+        self.assertUsesIndex(WorkoutLog.objects.filter(user=self.user), 'workoutlog_user_date_idx')
+
+    def assertIssuedQueriesUseIndex(self, run, index_name):
+        """EXPLAIN the exact statements the ORM issues while calling ``run``."""
+        with CaptureQueriesContext(connection) as queries:
+            run()
+        self.assertTrue(queries.captured_queries)
+        for query in queries.captured_queries:
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+                plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+            self.assertRegex(plan, rf'USING (COVERING )?INDEX {index_name}\b', plan)
+            self.assertNotRegex(plan, r'\bSCAN\b', plan)
+
+    def test_unread_notifications(self):
+        # The unread count and mark-all-read statements from notifications.utils
+        unread = Notification.objects.filter(user=self.user, is_read=False)
+        self.assertIssuedQueriesUseIndex(unread.count, 'notif_user_read_idx')
+        self.assertIssuedQueriesUseIndex(lambda: unread.update(is_read=True), 'notif_user_read_idx')
+
+    def test_recent_notifications(self):
+        self.assertUsesIndex(Notification.objects.filter(user=self.user), 'notif_user_created_idx')
+
+    def test_weekly_goals(self):
+        self.assertUsesIndex(
+            WeeklyGoal.objects.filter(user=self.user, week_start=self.today, is_active=True).order_by(),
+            'goal_user_week_idx',
+        )
+
+    def test_upcoming_sessions(self):
+        self.assertUsesIndex(
+            WorkoutSession.objects.filter(user=self.user, session_date__gte=self.today),
+            'session_user_date_idx',
+        )
+
+
+class DailyRollupSignalTests(TestCase):
+    """WorkoutLog changes refresh the day's rollup in the same transaction."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('roller', 'roller@example.com', 'secret')
+        cls.today = timezone.localdate()
+
+    def rollup(self, date=None):
+        return DailyWorkoutRollup.objects.filter(user=self.user, date=date or self.today).first()
+
+    def test_two_saves_on_one_day_share_a_row(self):
+        WorkoutLog.objects.create(user=self.user, workout_type='cardio', duration=30, calories=200)
+        WorkoutLog.objects.create(user=self.user, workout_type='yoga', duration=20)
+
+        self.assertEqual(DailyWorkoutRollup.objects.filter(user=self.user).count(), 1)
+        rollup = self.rollup()
+        self.assertEqual((rollup.workout_count, rollup.total_duration, rollup.total_calories), (2, 50, 200))
+        self.assertEqual(rollup.type_counts, {'cardio': 1, 'yoga': 1})
+
+    def test_rollup_rolls_back_with_the_log(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            WorkoutLog.objects.create(user=self.user, workout_type='cardio', duration=30)
+            self.assertEqual(self.rollup().workout_count, 1)
+            raise RuntimeError
+
+        self.assertIsNone(self.rollup())
+
+    def test_moving_and_deleting_a_workout_refreshes_both_days(self):
+        yesterday = self.today - timedelta(days=1)
+        log = WorkoutLog.objects.create(user=self.user, workout_type='hiit', duration=15)
+        log.date = yesterday
+        log.save()
+
+        self.assertIsNone(self.rollup())
+        self.assertEqual(self.rollup(yesterday).workout_count, 1)
+
+        log.delete()
+        self.assertIsNone(self.rollup(yesterday))
+
+
+class ConcurrentRollupTests(TransactionTestCase):
+    """Members logging workouts for the same day at once."""
+
+    def test_concurrent_saves_land_in_one_row(self):
+        user = get_user_model().objects.create_user('racer', 'racer@example.com', 'secret')
+        threads = 6
+        barrier = threading.Barrier(threads)
+        errors = []
+
+        def log_workout():
+            try:
+                barrier.wait()
+                WorkoutLog.objects.create(user=user, workout_type='cardio', duration=10)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=log_workout) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        rollup = DailyWorkoutRollup.objects.get(user=user)
+        self.assertEqual((rollup.workout_count, rollup.total_duration), (threads, threads * 10))
+
+
+class StreakTests(TestCase):
+    """The stored streak follows WorkoutLog creates, edits and deletes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('streaker', 'streaker@example.com', 'secret')
+        cls.today = timezone.localdate()
+
+    def log(self, days_ago):
+        return WorkoutLog.objects.create(
+            user=self.user, workout_type='cardio', duration=20, date=self.today - timedelta(days=days_ago)
+        )
+
+    def streak(self):
+        return get_current_streak(self.user, today=self.today)
+
+    def test_consecutive_days_increment(self):
+        self.log(2)
+        self.log(1)
+        self.log(0)
+        self.log(0)
+        self.assertEqual(self.streak(), 3)
+
+    def test_gap_resets(self):
+        self.log(3)
+        self.log(2)
+        self.log(0)
+        self.assertEqual(self.streak(), 1)
+
+    def test_backdated_log_bridges_gap(self):
+        self.log(2)
+        self.log(0)
+        self.log(1)
+        self.assertEqual(self.streak(), 3)
+
+    def test_delete_breaks_streak(self):
+        self.log(2)
+        middle = self.log(1)
+        self.log(0)
+        middle.delete()
+        self.assertEqual(self.streak(), 1)
+
+    def test_editing_the_date_recomputes(self):
+        self.log(1)
+        moved = self.log(3)
+        moved.date = self.today
+        moved.save()
+        self.assertEqual(self.streak(), 2)
+
+    def test_future_log_does_not_hide_todays_streak(self):
+        self.log(1)
+        self.log(0)
+        self.log(-3)
+        self.assertEqual(self.streak(), 2)
+        self.assertEqual(MemberProfile.objects.get(user=self.user).last_workout_date, self.today)
+
+    def test_deleting_the_member_cascades_cleanly(self):
+        self.log(0)
+        self.user.delete()
+        self.assertFalse(WorkoutLog.objects.exists())
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_QUEUE_ENABLED=False)
+class SendRemindersTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        plan = Plan.objects.create(name='Monthly', price=100, duration_days=30)
+        end_date = timezone.localdate() + timedelta(days=3)
+        cls.active = Subscription.objects.create(
+            user=User.objects.create_user('active', 'active@example.com', 'secret'), plan=plan, end_date=end_date,
+        )
+        cls.cancelled = Subscription.objects.create(
+            user=User.objects.create_user('cancelled', 'cancelled@example.com', 'secret'), plan=plan, end_date=end_date,
+        )
+        Subscription.objects.filter(pk=cls.cancelled.pk).update(status='cancelled')
+
+    def test_cancelled_subscriptions_get_no_reminder(self):
+        call_command('send_reminders', stdout=StringIO())
+
+        self.assertEqual([message.to for message in mail.outbox], [['active@example.com']])
+        self.assertEqual(Notification.objects.filter(user=self.cancelled.user).count(), 0)
+        self.cancelled.refresh_from_db()
+        self.assertEqual((self.cancelled.status, self.cancelled.last_reminder_days), ('cancelled', None))
+        self.active.refresh_from_db()
+        self.assertEqual(self.active.last_reminder_days, 3)
+
+
+class WeeklyGoalProgressTests(TestCase):
+    """The SQL-annotated progress matches the per-goal Python computation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user('goalie', 'goalie@example.com', 'secret')
+        other = User.objects.create_user('bystander', 'bystander@example.com', 'secret')
+        cls.week_start = timezone.localdate() - timedelta(days=14)
+        for offset, duration, calories in [(-1, 99, 999), (0, 30, 200), (3, 45, None), (6, 20, 150), (7, 99, 999)]:
+            WorkoutLog.objects.create(
+                user=cls.user, workout_type='cardio', duration=duration, calories=calories,
+                date=cls.week_start + timedelta(days=offset),
+            )
+        WorkoutLog.objects.create(user=other, workout_type='cardio', duration=99, calories=999, date=cls.week_start)
+        for goal_type in ('workouts', 'duration', 'calories'):
+            WeeklyGoal.objects.create(user=cls.user, goal_type=goal_type, target_value=10, week_start=cls.week_start)
+
+    def test_annotated_progress_matches_current_progress(self):
+        # Day 0 and day 6 count; day -1 and day 7 belong to other weeks
+        expected = {'workouts': 3, 'duration': 95, 'calories': 350}
+        annotated = {goal.goal_type: goal.annotated_progress for goal in WeeklyGoal.objects.with_progress()}
+        computed = {goal.goal_type: goal.current_progress for goal in WeeklyGoal.objects.all()}
+
+        self.assertEqual(annotated, expected)
+        self.assertEqual(computed, expected)
+
+    def test_goal_without_workouts_has_zero_progress(self):
+        WeeklyGoal.objects.all().update(week_start=self.week_start + timedelta(days=28))
+        for goal in WeeklyGoal.objects.with_progress():
+            with self.subTest(goal_type=goal.goal_type):
+                self.assertEqual(goal.annotated_progress, 0)
+                self.assertEqual(WeeklyGoal.objects.get(pk=goal.pk).current_progress, 0)
+
+
+class WorkoutPaginationTests(TestCase):
+    """Keyset pagination over workouts that share (date, created_at)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('pager', 'pager@example.com', 'secret')
+        today = timezone.localdate()
+        for days_ago in (0, 0, 0, 0, 0, 1, 1):
+            WorkoutLog.objects.create(user=cls.user, workout_type='yoga', duration=10, date=today - timedelta(days=days_ago))
+        # Identical timestamps force the id tie-breaker across page boundaries
+        WorkoutLog.objects.update(created_at=timezone.now())
+
+    def test_pages_cover_every_row_once_in_order(self):
+        queryset = WorkoutLog.objects.filter(user=self.user)
+        expected = list(queryset.order_by(*WORKOUT_ORDERING).values_list('pk', flat=True))
+        seen, cursor, pages = [], None, 0
+        while True:
+            workouts, cursor = paginate_workouts(queryset, cursor=cursor, page_size=3)
+            seen.extend(workout.pk for workout in workouts)
+            pages += 1
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(InvalidCursor):
+            paginate_workouts(WorkoutLog.objects.all(), cursor='not-a-cursor')
@@ -12,6 +12,7 @@ urlpatterns = [
     path('renew/<int:plan_id>/', views.renew, name='renew'),
     path('log-workout/', views.log_workout, name='log_workout'),
     path('all-activities/', views.all_activities, name='all_activities'),
+    path('all-activities/more/', views.all_activities_more, name='all_activities_more'),
     path('profile/', views.profile, name='profile'),
     path('settings/', views.settings, name='settings'),
 ]
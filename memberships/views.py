@@ -3,13 +3,20 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
-from django.db.models import Sum, Count
 from django.http import JsonResponse
+from django.template.loader import render_to_string
 
 from django.conf import settings
 from .models import Plan, Subscription, WorkoutLog, WeeklyGoal, WorkoutSession
+from .stats import get_dashboard_stats, get_lifetime_totals
+from .streaks import get_current_streak
+from .subscriptions import get_active_until, get_current_subscription
+from .pagination import InvalidCursor, paginate_workouts
+from notifications.middleware import get_request_notifications
 from notifications.utils import notify_user
 
+ACTIVITY_PAGE_SIZE = 20
+
 
 def plan_list(request):
     plans = Plan.objects.filter(is_active=True).order_by('price')
@@ -23,13 +30,10 @@ def plan_detail(request, plan_id):
 
 @login_required
 def dashboard(request):
-    from notifications.models import Notification
-
-    sub = Subscription.objects.filter(user=request.user).order_by('-created_at').first()
+    sub = get_current_subscription(request.user)
 
-    # Get recent notifications (last 10)
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')[:10]
-    unread_notifications_count = Notification.objects.filter(user=request.user, is_read=False).count()
+    # Recent notifications and unread count, loaded once per request
+    notifications = get_request_notifications(request)
 
     # Initialize default values
     calories_burned = 0
@@ -41,35 +45,13 @@ def dashboard(request):
     try:
         # Get workout statistics
         today = timezone.localdate()
-        week_start = today - timedelta(days=7)
-        month_start = today - timedelta(days=30)
+        stats = get_dashboard_stats(request.user, today=today)
+        calories_burned = stats.calories_this_week
+        workouts_this_month = stats.workouts_this_month
+        total_hours = stats.total_hours
 
-        # Calories burned this week
-        calories_burned = WorkoutLog.objects.filter(
-            user=request.user,
-            date__gte=week_start
-        ).aggregate(total=Sum('calories'))['total'] or 0
-
-        # Workouts this month
-        workouts_this_month = WorkoutLog.objects.filter(
-            user=request.user,
-            date__gte=month_start
-        ).count()
-
-        # Calculate streak
-        current_date = today
-        while True:
-            if WorkoutLog.objects.filter(user=request.user, date=current_date).exists():
-                streak_days += 1
-                current_date -= timedelta(days=1)
-            else:
-                break
-
-        # Total hours
-        total_duration = WorkoutLog.objects.filter(
-            user=request.user
-        ).aggregate(total=Sum('duration'))['total'] or 0
-        total_hours = round(total_duration / 60, 1)
+        # Current streak (stored on the profile, updated by log_workout)
+        streak_days = get_current_streak(request.user, today=today)
 
         # Recent workouts
         recent_workouts = WorkoutLog.objects.filter(user=request.user)[:3]
@@ -85,7 +67,7 @@ def dashboard(request):
         user=request.user,
         is_active=True,
         week_start=week_start
-    )
+    ).with_progress()
 
     # Get upcoming sessions
     upcoming_sessions = WorkoutSession.objects.filter(
@@ -100,8 +82,8 @@ def dashboard(request):
         'streak_days': streak_days,
         'total_hours': total_hours,
         'recent_workouts': recent_workouts,
-        'notifications': notifications,
-        'unread_notifications_count': unread_notifications_count,
+        'notifications': notifications.recent,
+        'unread_notifications_count': notifications.unread_count,
         'weekly_goals': weekly_goals,
         'upcoming_sessions': upcoming_sessions,
     }
@@ -128,17 +110,17 @@ def subscribe(request, plan_id):
 
 @login_required
 def my_subscription(request):
-    sub = Subscription.objects.filter(user=request.user).order_by('-created_at').first()
+    sub = get_current_subscription(request.user)
     return render(request, 'memberships/my_subscription.html', {"subscription": sub})
 
 
 @login_required
 def renew(request, plan_id):
     plan = get_object_or_404(Plan, pk=plan_id, is_active=True)
-    last = Subscription.objects.filter(user=request.user).order_by('-end_date').first()
+    active_until = get_active_until(request.user)
     start = timezone.localdate()
-    if last and last.end_date >= start:
-        start = last.end_date + timedelta(days=1)
+    if active_until and active_until >= start:
+        start = active_until + timedelta(days=1)
     end = start + timedelta(days=plan.duration_days)
     sub = Subscription.objects.create(user=request.user, plan=plan, start_date=start, end_date=end)
     messages.success(request, f"Renewed {plan.name}. New period {sub.start_date} to {sub.end_date}.")
@@ -154,6 +136,7 @@ def log_workout(request):
         calories = request.POST.get('calories') or None
         notes = request.POST.get('notes', '')
 
+        # The WorkoutLog signals update the rollup and the stored streak
         WorkoutLog.objects.create(
             user=request.user,
             workout_type=workout_type,
@@ -171,37 +154,51 @@ def log_workout(request):
 @login_required
 def all_activities(request):
     """View all workout activities"""
-    from notifications.models import Notification
-
-    # Get all workout logs for the user, paginated
-    all_workouts = WorkoutLog.objects.filter(user=request.user).order_by('-date', '-created_at')
+    # First page of the workout history; later pages come from all_activities_more
+    all_workouts, next_cursor = paginate_workouts(
+        WorkoutLog.objects.filter(user=request.user), page_size=ACTIVITY_PAGE_SIZE
+    )
 
-    # Calculate total stats
-    total_workouts = all_workouts.count()
-    total_duration = all_workouts.aggregate(total=Sum('duration'))['total'] or 0
-    total_calories = all_workouts.aggregate(total=Sum('calories'))['total'] or 0
-    total_hours = round(total_duration / 60, 1)
+    # Calculate total stats from the daily rollups
+    totals = get_lifetime_totals(request.user)
+    total_workouts = totals.workouts
+    total_calories = totals.calories
+    total_hours = totals.hours
 
-    # Get notifications
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')[:10]
-    unread_notifications_count = Notification.objects.filter(user=request.user, is_read=False).count()
+    # Get notifications (shared with the unread_notifications context processor)
+    notifications = get_request_notifications(request)
 
     ctx = {
         'all_workouts': all_workouts,
+        'next_cursor': next_cursor,
         'total_workouts': total_workouts,
         'total_hours': total_hours,
         'total_calories': total_calories,
-        'notifications': notifications,
-        'unread_notifications_count': unread_notifications_count,
+        'notifications': notifications.recent,
+        'unread_notifications_count': notifications.unread_count,
     }
     return render(request, 'memberships/all_activities.html', ctx)
 
 
+@login_required
+def all_activities_more(request):
+    """Return the next page of workout history as rendered HTML (infinite scroll)."""
+    try:
+        workouts, next_cursor = paginate_workouts(
+            WorkoutLog.objects.filter(user=request.user),
+            cursor=request.GET.get('cursor'),
+            page_size=ACTIVITY_PAGE_SIZE,
+        )
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+    html = render_to_string('memberships/partials/workout_list.html', {'workouts': workouts}, request=request)
+    return JsonResponse({'html': html, 'next_cursor': next_cursor})
+
+
 @login_required
 def profile(request):
     """User profile update page"""
-    from notifications.models import Notification
-
     if request.method == 'POST':
         user = request.user
         user.first_name = request.POST.get('first_name', '')
@@ -211,13 +208,12 @@ def profile(request):
         messages.success(request, 'Profile updated successfully!')
         return redirect('memberships:profile')
 
-    # Get notifications
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')[:10]
-    unread_notifications_count = Notification.objects.filter(user=request.user, is_read=False).count()
+    # Get notifications (shared with the unread_notifications context processor)
+    notifications = get_request_notifications(request)
 
     ctx = {
-        'notifications': notifications,
-        'unread_notifications_count': unread_notifications_count,
+        'notifications': notifications.recent,
+        'unread_notifications_count': notifications.unread_count,
     }
     return render(request, 'memberships/profile.html', ctx)
 
@@ -225,8 +221,6 @@ def profile(request):
 @login_required
 def settings(request):
     """User settings page"""
-    from notifications.models import Notification
-
     if request.method == 'POST':
         # Handle settings updates (e.g., notification preferences, password change)
         action = request.POST.get('action')
@@ -245,12 +239,11 @@ def settings(request):
                     messages.error(request, error[0])
             return redirect('memberships:settings')
 
-    # Get notifications
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')[:10]
-    unread_notifications_count = Notification.objects.filter(user=request.user, is_read=False).count()
+    # Get notifications (shared with the unread_notifications context processor)
+    notifications = get_request_notifications(request)
 
     ctx = {
-        'notifications': notifications,
-        'unread_notifications_count': unread_notifications_count,
+        'notifications': notifications.recent,
+        'unread_notifications_count': notifications.unread_count,
     }
     return render(request, 'memberships/settings.html', ctx)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Notification
+from core.admin import RetryNowMixin
+from .models import Notification, OutboundEmail
 
 
 @admin.register(Notification)
@@ -8,3 +9,15 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ("is_read",)
     search_fields = ("user__username", "title")
 
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(RetryNowMixin, admin.ModelAdmin):
+    list_display = ("subject", "recipients", "status", "attempts", "next_attempt_at", "created_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("subject", "to")
+    readonly_fields = ("created_at", "sent_at", "locked_at", "last_error")
+    retry_done_status = 'sent'
+
+    def recipients(self, obj):
+        return ", ".join(obj.to)
+    recipients.short_description = "To"
@@ -5,3 +5,5 @@ class NotificationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notifications'
 
+    def ready(self):
+        from . import signals  # noqa: F401
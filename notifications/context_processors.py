@@ -1,7 +1,7 @@
-def unread_notifications(request):
-    if request.user.is_authenticated:
-        return {
-            'unread_notifications_count': request.user.notifications.filter(is_read=False).count()
-        }
-    return {'unread_notifications_count': 0}
+from .middleware import get_request_notifications
+
 
+def unread_notifications(request):
+    return {
+        'unread_notifications_count': get_request_notifications(request).unread_count
+    }
@@ -0,0 +1,147 @@
+"""
+Database-backed outbound email queue.
+
+Request handlers call enqueue_email()/enqueue_message(), which cost a
+single INSERT. The process_email_queue management command (run from cron)
+delivers queued rows in batches over one mail connection, retrying
+failures with exponential backoff and moving rows that keep failing to
+the dead-letter state.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils import timezone
+
+from core import work_queue
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def _default_from_email():
+    return getattr(settings, 'DEFAULT_FROM_EMAIL', 'no-reply@magma7fitness.local')
+
+
+def _build_email(subject, body, to, from_email=None, html_body=''):
+    if isinstance(to, str):
+        to = [to]
+    return OutboundEmail(
+        subject=subject[:255],
+        body=body,
+        html_body=html_body or '',
+        from_email=from_email or _default_from_email(),
+        to=list(to),
+    )
+
+
+def queue_enabled():
+    return getattr(settings, 'EMAIL_QUEUE_ENABLED', True)
+
+
+def enqueue_email(subject, body, to, from_email=None, html_body=''):
+    """Queue one email for background delivery."""
+    email = _build_email(subject, body, to, from_email=from_email, html_body=html_body)
+    email.save()
+    return email
+
+
+def enqueue_emails(messages, batch_size=500):
+    """Queue many emails at once from dicts of enqueue_email() keyword arguments."""
+    emails = [_build_email(**message) for message in messages]
+    return OutboundEmail.objects.bulk_create(emails, batch_size=batch_size)
+
+
+def enqueue_message(message):
+    """
+    Queue an already-built EmailMessage/EmailMultiAlternatives.
+
+    The queue stores subject, bodies, sender and recipients only; a message
+    using cc/bcc/reply_to, extra headers, attachments or a non-HTML
+    alternative raises ValueError rather than losing them. Send such
+    messages directly.
+    """
+    unsupported = [
+        name for name in ('cc', 'bcc', 'reply_to', 'extra_headers', 'attachments')
+        if getattr(message, name, None)
+    ]
+    html_body = ''
+    for content, mimetype in getattr(message, 'alternatives', []):
+        if mimetype == 'text/html' and not html_body:
+            html_body = content
+        else:
+            unsupported.append(f'{mimetype} alternative')
+    if unsupported:
+        raise ValueError(f"The email queue can't store {', '.join(unsupported)}")
+    return enqueue_email(message.subject, message.body, message.to, from_email=message.from_email, html_body=html_body)
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2*base, 4*base, ... capped at one day."""
+    return work_queue.retry_delay(attempts, base_seconds=getattr(settings, 'EMAIL_QUEUE_RETRY_BASE_SECONDS', 60))
+
+
+def claim_batch(batch_size):
+    """Lock up to ``batch_size`` due rows for this worker and return them."""
+    return work_queue.claim_batch(OutboundEmail, batch_size, 'sending')
+
+
+def _to_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def deliver_batch(emails, connection, max_attempts):
+    """Send claimed rows one by one over ``connection``; returns (sent, retried, dead)."""
+    sent = retried = dead = 0
+    for email in emails:
+        try:
+            connection.open()  # no-op while the connection is still open
+            connection.send_messages([_to_message(email, connection)])
+        except Exception as e:
+            logger.warning("Outbound email %s failed: %s", email.pk, e)
+            if work_queue.schedule_retry(email, str(e), max_attempts, 'dead', delay=retry_delay) == 'dead':
+                dead += 1
+            else:
+                retried += 1
+            # The connection may be unusable after an SMTP error
+            connection.close()
+            continue
+        email.status = 'sent'
+        email.sent_at = timezone.now()
+        email.locked_at = None
+        email.save(update_fields=['status', 'sent_at', 'locked_at'])
+        sent += 1
+    return sent, retried, dead
+
+
+def process_queue(batch_size=50, max_batches=None, max_attempts=None):
+    """
+    Drain due emails until the queue is empty (or ``max_batches`` is reached).
+
+    Returns a dict with sent/retried/dead totals.
+    """
+    max_attempts = max_attempts or getattr(settings, 'EMAIL_QUEUE_MAX_ATTEMPTS', 5)
+    totals = {'sent': 0, 'retried': 0, 'dead': 0}
+    connection = get_connection()
+
+    def deliver(emails):
+        sent, retried, dead = deliver_batch(emails, connection, max_attempts)
+        totals['sent'] += sent
+        totals['retried'] += retried
+        totals['dead'] += dead
+
+    try:
+        work_queue.drain(lambda: claim_batch(batch_size), deliver, max_batches)
+    finally:
+        connection.close()
+    return totals
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from notifications.mail_queue import process_queue
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbound emails (run from cron, e.g. every minute)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+        parser.add_argument('--max-attempts', type=int, default=None, help='Attempts before an email is dead-lettered')
+
+    def handle(self, *args, **options):
+        totals = process_queue(
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            max_attempts=options['max_attempts'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['sent']} email(s), {totals['retried']} scheduled for retry, {totals['dead']} dead-lettered."
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from notifications.models import Notification
+from users.models import MemberProfile
+
+
+class Command(BaseCommand):
+    help = "Recompute every member's unread notification counter from the notifications table."
+
+    def handle(self, *args, **options):
+        unread = (
+            Notification.objects.filter(user_id=OuterRef('user_id'), is_read=False)
+            .order_by().values('user_id').annotate(n=Count('pk')).values('n')
+        )
+        stale = MemberProfile.objects.exclude(
+            unread_notifications=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+        )
+        updated = stale.update(
+            unread_notifications=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+        )
+        self.stdout.write(self.style.SUCCESS(f"Corrected {updated} unread counter(s)."))
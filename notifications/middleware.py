@@ -0,0 +1,48 @@
+from django.utils.functional import cached_property
+
+from .models import Notification
+from .utils import get_unread_count
+
+RECENT_NOTIFICATIONS_LIMIT = 10
+
+
+class RequestNotifications:
+    """
+    Lazily loaded notifications for the current request's user.
+
+    Each value is queried at most once per request, no matter how many views,
+    templates or context processors read it.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def recent(self):
+        if not self.user.is_authenticated:
+            return []
+        return list(Notification.objects.filter(user=self.user).order_by('-created_at')[:RECENT_NOTIFICATIONS_LIMIT])
+
+    @cached_property
+    def unread_count(self):
+        if not self.user.is_authenticated:
+            return 0
+        return get_unread_count(self.user)
+
+
+def get_request_notifications(request):
+    """Return ``request.notifications``, attaching it if the middleware did not run."""
+    if not hasattr(request, 'notifications'):
+        request.notifications = RequestNotifications(request.user)
+    return request.notifications
+
+
+class NotificationsMiddleware:
+    """Attach a lazy ``request.notifications`` accessor to every request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.notifications = RequestNotifications(request.user)
+        return self.get_response(request)
@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from users.models import MemberProfile
+
+from .models import Notification
+from .utils import sync_unread_count
+
+
+@receiver(pre_save, sender=Notification)
+def remember_previous_state(sender, instance, update_fields=None, **kwargs):
+    # Only a change of reader or read flag can move the counter
+    instance._previous_state = None
+    if instance.pk and (update_fields is None or {'user', 'is_read'} & set(update_fields)):
+        instance._previous_state = (
+            Notification.objects.filter(pk=instance.pk).values_list('user_id', 'is_read').first()
+        )
+
+
+@receiver(post_save, sender=Notification)
+def update_unread_count_on_save(sender, instance, created, **kwargs):
+    # Single-row saves (admin edits, Notification.objects.create) bypass the
+    # counter updates in utils; bulk_create in create_notifications sends no signal
+    if created:
+        if not instance.is_read:
+            sync_unread_count(instance.user_id)
+        return
+    previous = getattr(instance, '_previous_state', None)
+    if previous is None or previous == (instance.user_id, instance.is_read):
+        return
+    sync_unread_count(instance.user_id)
+    if previous[0] != instance.user_id:
+        sync_unread_count(previous[0])
+
+
+@receiver(post_delete, sender=Notification)
+def update_unread_count_on_delete(sender, instance, **kwargs):
+    if not instance.is_read:
+        sync_unread_count(instance.user_id)
+
+
+@receiver(post_save, sender=MemberProfile)
+def fill_unread_count(sender, instance, created, **kwargs):
+    # A profile created after the member already has notifications
+    if created:
+        instance.unread_notifications = sync_unread_count(instance.user_id)
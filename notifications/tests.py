@@ -0,0 +1,235 @@
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.work_queue import STALE_LOCK_AFTER
+from users.models import MemberProfile
+
+from . import mail_queue
+from .models import Notification, OutboundEmail
+from .utils import create_notifications, notify_user, notify_users, send_email_batches
+
+
+class CountingBackend(EmailBackend):
+    """locmem backend that records how it is used and can fail chosen batches."""
+
+    def __init__(self, *args, fail_batches=(), fail_open=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fail_batches = set(fail_batches)
+        self.fail_open = fail_open
+        self.opened = 0
+        self.batches = 0
+
+    def open(self):
+        if self.fail_open:
+            raise ConnectionRefusedError('SMTP server unreachable')
+        self.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        batch = self.batches
+        self.batches += 1
+        if batch in self.fail_batches:
+            raise ConnectionResetError(f'batch {batch} dropped')
+        return super().send_messages(messages)
+
+
+def _emails(count):
+    return [
+        EmailMessage(f'Subject {i}', 'Body', 'gym@example.com', [f'member{i}@example.com'])
+        for i in range(count)
+    ]
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_QUEUE_ENABLED=False)
+class SendEmailBatchesTests(TestCase):
+
+    def test_batches_share_one_connection(self):
+        connection = CountingBackend()
+        sent, errors = send_email_batches(_emails(5), batch_size=2, connection=connection)
+
+        self.assertEqual((sent, errors), (5, []))
+        self.assertEqual(connection.batches, 3)
+        self.assertEqual(connection.opened, 1)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_failed_batch_is_reported_and_later_batches_still_sent(self):
+        connection = CountingBackend(fail_batches={1})
+        with self.assertLogs('notifications.utils', 'ERROR'):
+            sent, errors = send_email_batches(_emails(5), batch_size=2, connection=connection)
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].batch, 1)
+        self.assertEqual(errors[0].recipients, ['member2@example.com', 'member3@example.com'])
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_unreachable_server_reports_every_batch(self):
+        connection = CountingBackend(fail_open=True)
+        with self.assertLogs('notifications.utils', 'ERROR'):
+            sent, errors = send_email_batches(_emails(5), batch_size=2, connection=connection)
+
+        self.assertEqual(sent, 0)
+        self.assertEqual([error.batch for error in errors], [0, 1, 2])
+        self.assertEqual(len(mail.outbox), 0)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_QUEUE_ENABLED=False)
+class NotifyUsersTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.users = [User.objects.create_user(f'member{i}', f'member{i}@example.com', 'secret') for i in range(5)]
+
+    def test_notify_users_batches_emails_and_bulk_creates_notifications(self):
+        result = notify_users([(user, 'Hello', 'Body') for user in self.users], batch_size=2)
+
+        self.assertEqual(result.notifications, 5)
+        self.assertEqual(result.emails_sent, 5)
+        self.assertEqual(result.errors, [])
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(EMAIL_BACKEND='notifications.tests.UnreachableBackend')
+    def test_notify_user_survives_smtp_outage(self):
+        with self.assertLogs('notifications.utils', 'ERROR'):
+            result = notify_user(self.users[0], 'Receipt', 'Thanks')
+
+        self.assertEqual(result.emails_sent, 0)
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(Notification.objects.filter(user=self.users[0]).count(), 1)
+
+
+class UnreadCounterSignalTests(TestCase):
+    """Single-row saves and deletes keep the profile counter in step."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.member, cls.other = [User.objects.create_user(name, f'{name}@example.com', 'secret') for name in ('member', 'other')]
+
+    def unread(self, user):
+        return MemberProfile.objects.get(user=user).unread_notifications
+
+    def test_create_counts_unread_rows_only(self):
+        Notification.objects.create(user=self.member, title='Hi', body='Body')
+        Notification.objects.create(user=self.member, title='Old', body='Body', is_read=True)
+        self.assertEqual(self.unread(self.member), 1)
+
+    def test_read_flag_change_resyncs(self):
+        notification = Notification.objects.create(user=self.member, title='Hi', body='Body')
+        notification.is_read = True
+        notification.save()
+        self.assertEqual(self.unread(self.member), 0)
+
+    def test_save_without_read_flag_change_skips_resync(self):
+        notification = Notification.objects.create(user=self.member, title='Hi', body='Body')
+        notification.title = 'Edited'
+        # The previous-state lookup and the UPDATE, but no COUNT or profile write
+        with self.assertNumQueries(2):
+            notification.save()
+        with self.assertNumQueries(1):
+            notification.save(update_fields=['title'])
+
+    def test_moving_to_another_member_resyncs_both(self):
+        notification = Notification.objects.create(user=self.member, title='Hi', body='Body')
+        notification.user = self.other
+        notification.save()
+        self.assertEqual((self.unread(self.member), self.unread(self.other)), (0, 1))
+
+    def test_delete_resyncs_only_for_unread_rows(self):
+        unread = Notification.objects.create(user=self.member, title='Hi', body='Body')
+        read = Notification.objects.create(user=self.member, title='Old', body='Body', is_read=True)
+        with self.assertNumQueries(1):
+            read.delete()
+        unread.delete()
+        self.assertEqual(self.unread(self.member), 0)
+
+    def test_create_notifications_counts_once(self):
+        create_notifications([(self.member, 'Hi', 'Body'), (self.member, 'Again', 'Body')])
+        self.assertEqual(self.unread(self.member), 2)
+
+
+class UnreachableBackend(CountingBackend):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, fail_open=True, **kwargs)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_QUEUE_RETRY_BASE_SECONDS=60)
+class MailQueueTests(TestCase):
+    """Claiming, delivery, backoff and dead-lettering of queued emails."""
+
+    def enqueue(self, subject='Hello'):
+        return mail_queue.enqueue_email(subject, 'Body', 'member@example.com', from_email='gym@example.com')
+
+    def test_delivered_row_is_marked_sent(self):
+        message = EmailMultiAlternatives('Receipt', 'Text', 'gym@example.com', ['member@example.com'])
+        message.attach_alternative('<p>Html</p>', 'text/html')
+        email = mail_queue.enqueue_message(message)
+
+        self.assertEqual(mail_queue.process_queue(), {'sent': 1, 'retried': 0, 'dead': 0})
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'sent')
+        self.assertIsNotNone(email.sent_at)
+        self.assertIsNone(email.locked_at)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].alternatives[0][0], '<p>Html</p>')
+
+    @override_settings(EMAIL_BACKEND='notifications.tests.UnreachableBackend')
+    def test_failure_counts_an_attempt_and_backs_off(self):
+        email = self.enqueue()
+        before = timezone.now()
+        with self.assertLogs('notifications.mail_queue', 'WARNING'):
+            totals = mail_queue.process_queue(max_attempts=3)
+
+        self.assertEqual(totals, {'sent': 0, 'retried': 1, 'dead': 0})
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertIn('unreachable', email.last_error)
+        self.assertGreaterEqual(email.next_attempt_at, before + mail_queue.retry_delay(1))
+        # Not due again until the backoff has passed
+        self.assertEqual(mail_queue.claim_batch(10), [])
+
+    @override_settings(EMAIL_BACKEND='notifications.tests.UnreachableBackend')
+    def test_last_attempt_moves_row_to_dead_letter(self):
+        email = self.enqueue()
+        OutboundEmail.objects.filter(pk=email.pk).update(attempts=2)
+        with self.assertLogs('notifications.mail_queue', 'WARNING'):
+            totals = mail_queue.process_queue(max_attempts=3)
+
+        self.assertEqual(totals, {'sent': 0, 'retried': 0, 'dead': 1})
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('dead', 3))
+        self.assertEqual(mail_queue.process_queue(max_attempts=3), {'sent': 0, 'retried': 0, 'dead': 0})
+
+    def test_claimed_rows_are_not_claimed_again(self):
+        first, second = self.enqueue('First'), self.enqueue('Second')
+
+        claimed = mail_queue.claim_batch(1)
+        self.assertEqual([email.pk for email in claimed], [first.pk])
+        self.assertEqual(claimed[0].status, 'sending')
+        # Another worker only gets what is left
+        self.assertEqual([email.pk for email in mail_queue.claim_batch(10)], [second.pk])
+        self.assertEqual(mail_queue.claim_batch(10), [])
+
+    def test_stale_lock_is_reclaimed(self):
+        email = self.enqueue()
+        mail_queue.claim_batch(10)
+        OutboundEmail.objects.filter(pk=email.pk).update(locked_at=timezone.now() - STALE_LOCK_AFTER * 2)
+
+        self.assertEqual([row.pk for row in mail_queue.claim_batch(10)], [email.pk])
+
+    def test_enqueue_message_rejects_what_it_cannot_store(self):
+        for kwargs in ({'cc': ['boss@example.com']}, {'bcc': ['audit@example.com']}, {'reply_to': ['member@example.com']}):
+            message = EmailMessage('Hi', 'Body', 'gym@example.com', ['member@example.com'], **kwargs)
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                mail_queue.enqueue_message(message)
+        message = EmailMessage('Hi', 'Body', 'gym@example.com', ['member@example.com'])
+        message.attach('plan.pdf', b'%PDF', 'application/pdf')
+        with self.assertRaises(ValueError):
+            mail_queue.enqueue_message(message)
+        self.assertFalse(OutboundEmail.objects.exists())
@@ -6,4 +6,5 @@ app_name = 'notifications'
 urlpatterns = [
     path('', views.list_notifications, name='list'),
     path('mark-all-read/', views.mark_all_read, name='mark_all_read'),
+    path('mark-read/<int:pk>/', views.mark_read, name='mark_read'),
 ]
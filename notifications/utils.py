@@ -1,17 +1,187 @@
-from django.core.mail import send_mail
+import logging
+from collections import Counter, defaultdict
+from typing import NamedTuple
+
+from django.core.mail import EmailMessage, get_connection
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from users.models import MemberProfile
+from .mail_queue import enqueue_emails, queue_enabled
 from .models import Notification
 
+logger = logging.getLogger(__name__)
 
-def notify_user(user, title: str, body: str, email: bool = True, in_app: bool = True):
-    if in_app:
-        Notification.objects.create(user=user, title=title, body=body)
-    if email and user.email:
-        send_mail(
-            subject=f"{getattr(settings, 'SITE_NAME', 'Magma7Fitness')}: {title}",
-            message=body,
-            from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'no-reply@magma7fitness.local'),
-            recipient_list=[user.email],
-            fail_silently=True,
-        )
 
+class NotificationMessage(NamedTuple):
+    user: object
+    title: str
+    body: str
+    email: bool = True
+    in_app: bool = True
+
+
+class EmailBatchError(NamedTuple):
+    batch: int
+    recipients: list
+    error: str
+
+
+class NotifyResult(NamedTuple):
+    notifications: int
+    emails_sent: int
+    errors: list
+    emails_queued: int = 0
+
+
+def get_unread_count(user):
+    """Return the user's unread notification count from the profile counter."""
+    count = MemberProfile.objects.filter(user=user).values_list('unread_notifications', flat=True).first()
+    if count is None:
+        # No profile row (legacy account); fall back to counting
+        count = Notification.objects.filter(user=user, is_read=False).count()
+    return count
+
+
+def increment_unread(user, by: int = 1):
+    MemberProfile.objects.filter(user=user).update(unread_notifications=F('unread_notifications') + by)
+
+
+def sync_unread_count(user_id):
+    """Reset the profile counter to the actual number of unread notifications."""
+    count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+    MemberProfile.objects.filter(user_id=user_id).update(unread_notifications=count)
+    return count
+
+
+def create_notifications(items, batch_size: int = 500):
+    """
+    Bulk-create in-app notifications from ``(user, title, body)`` tuples and
+    bump each recipient's unread counter. Returns the created Notification rows.
+    """
+    notifications = [Notification(user=user, title=title, body=body) for user, title, body in items]
+    with transaction.atomic():
+        Notification.objects.bulk_create(notifications, batch_size=batch_size)
+
+        # One UPDATE per distinct increment (usually just +1 for everyone)
+        users_by_increment = defaultdict(list)
+        for user_id, count in Counter(n.user_id for n in notifications).items():
+            users_by_increment[count].append(user_id)
+        for count, user_ids in users_by_increment.items():
+            MemberProfile.objects.filter(user_id__in=user_ids).update(unread_notifications=F('unread_notifications') + count)
+    return notifications
+
+
+def mark_all_read(user):
+    """Mark every unread notification read and reset the counter."""
+    with transaction.atomic():
+        # Lock the profile so a concurrent create_notifications() either
+        # lands before this (and is marked read) or after it (and is counted)
+        list(MemberProfile.objects.select_for_update().filter(user=user).values_list('pk', flat=True))
+        Notification.objects.filter(user=user, is_read=False).update(is_read=True)
+        sync_unread_count(user.pk)
+
+
+def mark_read(user, notification_id):
+    """Mark one of the user's notifications read. Returns True if it was unread."""
+    with transaction.atomic():
+        updated = Notification.objects.filter(pk=notification_id, user=user, is_read=False).update(is_read=True)
+        if updated:
+            MemberProfile.objects.filter(user=user, unread_notifications__gt=0).update(
+                unread_notifications=F('unread_notifications') - 1
+            )
+    return bool(updated)
+
+
+def _email_subject(title):
+    return f"{getattr(settings, 'SITE_NAME', 'Magma7Fitness')}: {title}"
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        logger.warning("Closing the mail connection failed", exc_info=True)
+
+
+def send_email_batches(emails, batch_size=None, connection=None):
+    """
+    Send EmailMessages over one reused connection, ``batch_size`` at a time.
+
+    A failing batch is logged and reported, and the remaining batches are
+    still attempted. If the connection can't be opened at all, every batch is
+    reported as failed. Never raises. Returns
+    ``(sent_count, [EmailBatchError, ...])``.
+    """
+    batch_size = batch_size or getattr(settings, 'NOTIFICATION_EMAIL_BATCH_SIZE', 100)
+    connection = connection or get_connection()
+    sent = 0
+    errors = []
+    try:
+        try:
+            connection.open()
+        except Exception as e:
+            logger.exception("Could not open the mail connection for notification emails")
+            return 0, [
+                EmailBatchError(
+                    batch=start // batch_size,
+                    recipients=[to for message in emails[start:start + batch_size] for to in message.to],
+                    error=str(e),
+                )
+                for start in range(0, len(emails), batch_size)
+            ]
+        for start in range(0, len(emails), batch_size):
+            batch = emails[start:start + batch_size]
+            try:
+                sent += connection.send_messages(batch) or 0
+            except Exception as e:
+                batch_number = start // batch_size
+                logger.exception("Notification email batch %s failed", batch_number)
+                errors.append(EmailBatchError(
+                    batch=batch_number,
+                    recipients=[to for message in batch for to in message.to],
+                    error=str(e),
+                ))
+                # Start the next batch on a fresh connection
+                _close_quietly(connection)
+    finally:
+        _close_quietly(connection)
+    return sent, errors
+
+
+def notify_users(messages, batch_size=None, queue=None):
+    """
+    Deliver many notifications at once.
+
+    ``messages`` is an iterable of NotificationMessage (or plain
+    ``(user, title, body)`` tuples). In-app rows are bulk-created. Emails are
+    added to the outbound queue when it is enabled (``queue`` overrides the
+    EMAIL_QUEUE_ENABLED setting); otherwise they go out immediately in
+    batches over a single mail connection.
+    """
+    messages = [m if isinstance(m, NotificationMessage) else NotificationMessage(*m) for m in messages]
+
+    created = create_notifications([(m.user, m.title, m.body) for m in messages if m.in_app])
+
+    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'no-reply@magma7fitness.local')
+    if queue is None:
+        queue = queue_enabled()
+    if queue:
+        queued = enqueue_emails([
+            {'subject': _email_subject(m.title), 'body': m.body, 'to': [m.user.email], 'from_email': from_email}
+            for m in messages
+            if m.email and m.user.email
+        ])
+        return NotifyResult(notifications=len(created), emails_sent=0, errors=[], emails_queued=len(queued))
+
+    emails = [
+        EmailMessage(_email_subject(m.title), m.body, from_email, [m.user.email])
+        for m in messages
+        if m.email and m.user.email
+    ]
+    sent, errors = send_email_batches(emails, batch_size=batch_size) if emails else (0, [])
+    return NotifyResult(notifications=len(created), emails_sent=sent, errors=errors, emails_queued=0)
+
+
+def notify_user(user, title: str, body: str, email: bool = True, in_app: bool = True):
+    return notify_users([NotificationMessage(user, title, body, email=email, in_app=in_app)])
@@ -1,16 +1,28 @@
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import redirect, render
+from django.views.decorators.http import require_POST
+
+from .utils import mark_all_read as mark_user_notifications_read
+from .utils import mark_read as mark_user_notification_read
 
 
 @login_required
 def list_notifications(request):
     # Auto-mark unread as read when visiting the page
-    request.user.notifications.filter(is_read=False).update(is_read=True)
+    mark_user_notifications_read(request.user)
     qs = request.user.notifications.all()
     return render(request, 'notifications/list.html', {"notifications": qs})
 
 
 @login_required
 def mark_all_read(request):
-    request.user.notifications.filter(is_read=False).update(is_read=True)
+    mark_user_notifications_read(request.user)
     return redirect('notifications:list')
+
+
+@login_required
+@require_POST
+def mark_read(request, pk):
+    mark_user_notification_read(request.user, pk)
+    return JsonResponse({'success': True})
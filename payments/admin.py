@@ -1,7 +1,8 @@
-import csv
 from django.contrib import admin
-from django.http import HttpResponse
-from .models import Payment
+from core.admin import RetryNowMixin
+from core.jobs import background_export_action
+from . import exports
+from .models import Payment, PaymentEvent
 
 
 @admin.register(Payment)
@@ -11,7 +12,10 @@ class PaymentAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "user__email", "reference")
     readonly_fields = ("created_at", "updated_at", "completed_at", "gateway_response")
     # date_hierarchy = "created_at"  # Disabled due to MySQL timezone tables not being populated
-    actions = ['export_payments_csv']
+    actions = [
+        'export_payments_csv',
+        background_export_action('payments', "Export selected payments in the background"),
+    ]
 
     def amount_display(self, obj):
         """Convert minor units to major units for display"""
@@ -20,36 +24,16 @@ class PaymentAdmin(admin.ModelAdmin):
 
     def export_payments_csv(self, request, queryset):
         """Export selected payments to CSV"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'payments_export_{timestamp}.csv'
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        writer = csv.writer(response)
-        writer.writerow([
-            'Payment ID', 'User ID', 'Username', 'Email', 'Plan Name',
-            'Amount', 'Currency', 'Provider', 'Status', 'Reference',
-            'Created At', 'Completed At'
-        ])
+        return exports.payments.stream(queryset)
+    export_payments_csv.short_description = "Export selected payments to CSV"
 
-        for payment in queryset:
-            writer.writerow([
-                payment.id,
-                payment.user.id,
-                payment.user.username,
-                payment.user.email,
-                payment.plan.name,
-                f"{payment.amount / 100:.2f}",
-                payment.currency,
-                payment.provider,
-                payment.status,
-                payment.reference,
-                payment.created_at,
-                payment.completed_at or 'N/A',
-            ])
 
-        return response
-    export_payments_csv.short_description = "Export selected payments to CSV"
 
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(RetryNowMixin, admin.ModelAdmin):
+    list_display = ("provider", "event_type", "reference", "status", "attempts", "created_at", "processed_at")
+    list_filter = ("provider", "status", "event_type")
+    search_fields = ("reference", "event_key")
+    readonly_fields = ("provider", "event_key", "event_type", "reference", "payload", "attempts",
+                       "locked_at", "last_error", "created_at", "processed_at")
+    retry_done_status = 'processed'
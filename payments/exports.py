@@ -0,0 +1,36 @@
+"""
+Export definitions for payments, used by the admin CSV action and background
+export jobs.
+"""
+from core.exports import Exporter, register
+
+
+def _payment_row(payment):
+    return [
+        payment.id,
+        payment.user.id,
+        payment.user.username,
+        payment.user.email,
+        payment.plan.name,
+        f"{payment.amount / 100:.2f}",
+        payment.currency,
+        payment.provider,
+        payment.status,
+        payment.reference,
+        payment.created_at,
+        payment.completed_at or 'N/A',
+    ]
+
+
+payments = register(Exporter(
+    name='payments',
+    label='Payments',
+    model='payments.Payment',
+    header=[
+        'Payment ID', 'User ID', 'Username', 'Email', 'Plan Name',
+        'Amount', 'Currency', 'Provider', 'Status', 'Reference',
+        'Created At', 'Completed At'
+    ],
+    row=_payment_row,
+    prepare=lambda queryset: queryset.select_related('user', 'plan'),
+))
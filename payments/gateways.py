@@ -0,0 +1,293 @@
+"""
+Payment gateway implementations behind a common interface.
+
+Views talk to a ``PaymentGateway`` obtained from ``get_gateway()`` instead of
+branching on the provider. ``PaystackGateway`` and ``StripeGateway`` wrap the
+real APIs; ``FakeGateway`` simulates the same initialize/verify/webhook flows
+locally, with configurable latency and failure rate, for load testing checkout
+without network access.
+"""
+import hashlib
+import hmac
+from abc import ABC, abstractmethod
+import json
+import random
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.urls import reverse
+
+from . import paystack
+
+
+class GatewayError(Exception):
+    """Raised when a gateway call fails or a provider payload is invalid."""
+
+
+@dataclass
+class CheckoutSession:
+    redirect_url: str
+    data: dict = field(default_factory=dict)
+
+
+@dataclass
+class VerificationResult:
+    reference: str
+    status: str  # 'success', 'failed' or 'pending'
+    data: dict = field(default_factory=dict)
+
+    @property
+    def succeeded(self):
+        return self.status == 'success'
+
+
+class PaymentGateway(ABC):
+    """Interface every payment provider implements."""
+    name = ''
+
+    @abstractmethod
+    def initialize(self, payment) -> CheckoutSession:
+        """Start a checkout for ``payment`` and return where to send the member."""
+
+    @abstractmethod
+    def verify(self, payment) -> VerificationResult:
+        """Ask the provider for the current state of ``payment``."""
+
+    @abstractmethod
+    def verify_return(self, request) -> VerificationResult:
+        """Verify the payment the member's browser returned from checkout with."""
+
+    @abstractmethod
+    def parse_webhook(self, request) -> VerificationResult | None:
+        """
+        Validate a webhook delivery. Returns a result for payment events,
+        None for events that can be ignored, and raises GatewayError when the
+        payload or signature is invalid.
+        """
+
+
+class PaystackGateway(PaymentGateway):
+    name = 'paystack'
+    FAILED_STATUSES = {'failed', 'abandoned', 'reversed'}
+
+    def initialize(self, payment):
+        if not getattr(settings, 'PAYSTACK_SECRET_KEY', ''):
+            raise GatewayError('Payment gateway not configured.')
+        payload = {
+            'email': payment.user.email or 'placeholder@example.com',
+            'amount': payment.amount,
+            'currency': payment.currency,
+            'reference': payment.reference,
+            'callback_url': settings.SITE_URL + reverse('payments:paystack_callback'),
+            'metadata': {'plan_id': payment.plan_id, 'user_id': payment.user_id},
+        }
+        try:
+            resp = paystack.initialize_transaction(payload)
+        except paystack.PaystackError as e:
+            raise GatewayError(f'Could not connect to Paystack: {e}') from e
+        auth_url = (resp.get('data') or {}).get('authorization_url')
+        if not (resp.get('status') and auth_url):
+            raise GatewayError('Payment initialization failed.')
+        return CheckoutSession(redirect_url=auth_url)
+
+    def _result(self, reference, data):
+        status = (data.get('data') or {}).get('status')
+        if data.get('status') and status == 'success':
+            return VerificationResult(reference, 'success', data)
+        if not data.get('status') or status in self.FAILED_STATUSES:
+            return VerificationResult(reference, 'failed', data)
+        return VerificationResult(reference, 'pending', data)
+
+    def verify(self, payment):
+        return self.verify_reference(payment.reference)
+
+    def verify_reference(self, reference):
+        try:
+            data = paystack.verify_transaction(reference)
+        except paystack.PaystackError as e:
+            raise GatewayError(f'Could not verify Paystack transaction: {e}') from e
+        return self._result(reference, data)
+
+    def verify_return(self, request):
+        reference = request.GET.get('reference')
+        if not reference:
+            raise GatewayError('Missing reference')
+        return self.verify_reference(reference)
+
+    def parse_webhook(self, request):
+        secret = getattr(settings, 'PAYSTACK_SECRET_KEY', '')
+        if not secret:
+            # An empty key would make the signature trivially forgeable
+            raise GatewayError('Paystack secret key not configured')
+        expected = hmac.new(secret.encode(), request.body, hashlib.sha512).hexdigest()
+        if not hmac.compare_digest(expected, request.META.get('HTTP_X_PAYSTACK_SIGNATURE', '')):
+            raise GatewayError('Invalid signature')
+        try:
+            event = json.loads(request.body.decode('utf-8'))
+        except ValueError as e:
+            raise GatewayError('Invalid payload') from e
+        data = event.get('data') or {}
+        if event.get('event') != 'charge.success' or not data.get('reference'):
+            return None
+        return VerificationResult(data['reference'], 'success', event)
+
+
+class StripeGateway(PaymentGateway):
+    name = 'stripe'
+
+    def _stripe(self):
+        try:
+            import stripe
+        except Exception:
+            raise GatewayError('Stripe library not installed.')
+        stripe.api_key = getattr(settings, 'STRIPE_SECRET_KEY', '')
+        if not stripe.api_key:
+            raise GatewayError('Stripe not configured.')
+        return stripe
+
+    def initialize(self, payment):
+        stripe = self._stripe()
+        success_url = settings.SITE_URL + reverse('payments:stripe_success') + '?session_id={CHECKOUT_SESSION_ID}'
+        cancel_url = settings.SITE_URL + reverse('payments:stripe_cancel')
+        try:
+            session = stripe.checkout.Session.create(
+                mode='payment',
+                payment_method_types=['card'],
+                line_items=[{
+                    'price_data': {
+                        'currency': payment.currency.lower(),
+                        'product_data': {'name': f"{payment.plan.name} Membership"},
+                        'unit_amount': payment.amount,
+                    },
+                    'quantity': 1,
+                }],
+                metadata={'reference': payment.reference, 'plan_id': payment.plan_id, 'user_id': payment.user_id},
+                success_url=success_url,
+                cancel_url=cancel_url,
+                client_reference_id=payment.reference,
+            )
+        except Exception as e:
+            raise GatewayError('Stripe session creation failed.') from e
+        return CheckoutSession(redirect_url=session.url, data={'session_id': session.id})
+
+    def _session_result(self, session):
+        data = {'session': session.get('id'), 'payment_status': session.get('payment_status')}
+        if session.get('payment_status') == 'paid':
+            return VerificationResult(session.get('client_reference_id'), 'success', data)
+        if session.get('status') == 'expired':
+            return VerificationResult(session.get('client_reference_id'), 'failed', data)
+        return VerificationResult(session.get('client_reference_id'), 'pending', data)
+
+    def _retrieve(self, session_id):
+        stripe = self._stripe()
+        try:
+            return stripe.checkout.Session.retrieve(session_id)
+        except Exception as e:
+            raise GatewayError('Unable to verify Stripe session.') from e
+
+    def verify(self, payment):
+        session_id = (payment.gateway_response or {}).get('session_id')
+        if not session_id:
+            raise GatewayError('No Stripe session recorded for this payment.')
+        return self._session_result(self._retrieve(session_id))
+
+    def verify_return(self, request):
+        session_id = request.GET.get('session_id')
+        if not session_id:
+            raise GatewayError('Missing session_id')
+        return self._session_result(self._retrieve(session_id))
+
+    def parse_webhook(self, request):
+        webhook_secret = getattr(settings, 'STRIPE_WEBHOOK_SECRET', '')
+        if not webhook_secret:
+            # Never accept unsigned events; the webhook view is CSRF exempt
+            raise GatewayError('Stripe webhook secret not configured')
+        try:
+            import stripe
+        except Exception:
+            raise GatewayError('Stripe not available')
+        sig_header = request.META.get('HTTP_STRIPE_SIGNATURE', '')
+        try:
+            event = stripe.Webhook.construct_event(payload=request.body, sig_header=sig_header, secret=webhook_secret)
+        except Exception as e:
+            raise GatewayError('Invalid payload or signature') from e
+
+        event_type = event['type']
+        data = event['data']['object']
+        if event_type != 'checkout.session.completed':
+            return None
+        reference = data.get('client_reference_id') or (data.get('metadata') or {}).get('reference')
+        if not reference:
+            return None
+        return VerificationResult(reference, 'success', {'webhook': True, 'session': data.get('id')})
+
+
+class FakeGateway(PaymentGateway):
+    """
+    Local stand-in for a real provider. Every call sleeps for
+    FAKE_GATEWAY_LATENCY seconds. A payment fails with probability
+    FAKE_GATEWAY_FAILURE_RATE, decided per reference so repeated verifies
+    agree. Webhooks are signed with HMAC SHA256 using FAKE_GATEWAY_SECRET.
+    """
+    name = 'fake'
+
+    def _simulate_latency(self):
+        latency = getattr(settings, 'FAKE_GATEWAY_LATENCY', 0.0)
+        if latency:
+            time.sleep(latency)
+
+    def _fails(self, reference):
+        rate = getattr(settings, 'FAKE_GATEWAY_FAILURE_RATE', 0.0)
+        return random.Random(reference).random() < rate
+
+    @staticmethod
+    def sign(body: bytes) -> str:
+        secret = getattr(settings, 'FAKE_GATEWAY_SECRET', 'fake-secret').encode()
+        return hmac.new(secret, body, hashlib.sha256).hexdigest()
+
+    def initialize(self, payment):
+        self._simulate_latency()
+        callback_url = settings.SITE_URL + reverse('payments:fake_callback')
+        return CheckoutSession(redirect_url=f'{callback_url}?reference={payment.reference}')
+
+    def verify_reference(self, reference):
+        self._simulate_latency()
+        status = 'failed' if self._fails(reference) else 'success'
+        return VerificationResult(reference, status, {'fake': True, 'status': status})
+
+    def verify(self, payment):
+        return self.verify_reference(payment.reference)
+
+    def verify_return(self, request):
+        reference = request.GET.get('reference')
+        if not reference:
+            raise GatewayError('Missing reference')
+        return self.verify_reference(reference)
+
+    def parse_webhook(self, request):
+        if not hmac.compare_digest(self.sign(request.body), request.META.get('HTTP_X_FAKE_SIGNATURE', '')):
+            raise GatewayError('Invalid signature')
+        try:
+            event = json.loads(request.body.decode('utf-8'))
+        except ValueError as e:
+            raise GatewayError('Invalid payload') from e
+        if not event.get('reference'):
+            return None
+        return self.verify_reference(event['reference'])
+
+
+GATEWAYS = {
+    'paystack': PaystackGateway,
+    'stripe': StripeGateway,
+    'fake': FakeGateway,
+}
+
+
+def get_gateway(name: str | None = None) -> PaymentGateway:
+    """Return the gateway for ``name``, defaulting to settings.PAYMENT_PROVIDER."""
+    name = name or getattr(settings, 'PAYMENT_PROVIDER', 'paystack')
+    try:
+        return GATEWAYS[name]()
+    except KeyError:
+        raise GatewayError(f'Unsupported payment provider: {name}')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from payments import paystack
+from payments.webhooks import process_events
+
+
+class Command(BaseCommand):
+    help = "Verify recorded payment webhooks and fulfil payments (run from cron, e.g. every minute)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+        parser.add_argument('--max-attempts', type=int, default=None, help='Verify attempts before an event is failed')
+
+    def handle(self, *args, **options):
+        paystack.reset_metrics()
+        totals = process_events(
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            max_attempts=options['max_attempts'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {totals['processed']} event(s), {totals['ignored']} ignored, "
+            f"{totals['pending']} scheduled for retry, {totals['failed']} failed."
+        ))
+        for line in paystack.metrics_summary():
+            self.stdout.write(line)
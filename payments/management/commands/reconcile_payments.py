@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from payments import paystack
+from payments.gateways import GatewayError, get_gateway
+from payments.models import Payment
+from payments.services import fail_payment, fulfil_payment
+
+
+def stale_pending_payments(older_than, limit=None):
+    """Pending payments created before ``older_than``, oldest first (uses payment_status_created_idx)."""
+    payments = Payment.objects.filter(status='pending', created_at__lt=older_than).order_by('created_at')
+    if limit:
+        payments = payments[:limit]
+    return payments
+
+
+def verify(payment):
+    """Ask the payment's gateway for its state; runs in a worker thread, no DB access."""
+    try:
+        return payment, get_gateway(payment.provider).verify(payment), None
+    except GatewayError as e:
+        return payment, None, str(e)
+
+
+class Command(BaseCommand):
+    help = "Verify stale pending payments with their gateway and fulfil or fail them (run from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=30, help='Minutes a payment must have been pending')
+        parser.add_argument('--expire-after', type=int, default=24, help='Hours after which an unresolved payment is failed')
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent gateway requests')
+        parser.add_argument('--limit', type=int, default=500, help='Maximum payments to check per run')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        cutoff = now - timedelta(minutes=options['older_than'])
+        expire_before = now - timedelta(hours=options['expire_after'])
+        payments = list(stale_pending_payments(cutoff, options['limit']))
+
+        totals = {'fulfilled': 0, 'failed': 0, 'expired': 0, 'pending': 0, 'errors': 0}
+        paystack.reset_metrics()
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as pool:
+            # Gateway calls run in the pool; results are applied here on the main thread
+            for payment, result, error in pool.map(verify, payments):
+                if result is not None and result.succeeded:
+                    if fulfil_payment(payment.reference, result.data):
+                        totals['fulfilled'] += 1
+                elif result is not None and result.status == 'failed':
+                    if fail_payment(payment.reference, result.data):
+                        totals['failed'] += 1
+                elif payment.created_at < expire_before:
+                    if fail_payment(payment.reference, {'error': 'expired', 'detail': error or 'still pending'}):
+                        totals['expired'] += 1
+                elif error:
+                    self.stderr.write(f"{payment.reference}: {error}")
+                    totals['errors'] += 1
+                else:
+                    totals['pending'] += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {len(payments)} payment(s): {totals['fulfilled']} fulfilled, {totals['failed']} failed, "
+            f"{totals['expired']} expired, {totals['pending']} still pending, {totals['errors']} error(s)."
+        ))
+        for line in paystack.metrics_summary():
+            self.stdout.write(line)
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='provider',
+            field=models.CharField(choices=[('paystack', 'Paystack'), ('stripe', 'Stripe'), ('fake', 'Fake (local testing)')], max_length=10),
+        ),
+    ]
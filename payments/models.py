@@ -7,6 +7,7 @@ class Payment(models.Model):
     PROVIDERS = (
         ("paystack", "Paystack"),
         ("stripe", "Stripe"),
+        ("fake", "Fake (local testing)"),
     )
     STATUSES = (
         ("pending", "Pending"),
@@ -29,6 +30,9 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='payment_status_created_idx'),
+        ]
 
     def mark_success(self, response: dict | None = None):
         self.status = 'successful'
@@ -43,3 +47,41 @@ class Payment(models.Model):
             self.gateway_response = response
         self.save(update_fields=['status', 'gateway_response', 'updated_at'])
 
+
+
+class PaymentEvent(models.Model):
+    """
+    A provider webhook delivery, recorded on receipt and processed later by
+    the process_payment_events command. (provider, event_key) is unique so
+    redelivered webhooks are stored once.
+    """
+    STATUSES = (
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("processed", "Processed"),
+        ("ignored", "Ignored"),
+        ("failed", "Failed"),
+    )
+
+    provider = models.CharField(max_length=10, choices=Payment.PROVIDERS)
+    event_key = models.CharField(max_length=255)
+    event_type = models.CharField(max_length=100)
+    reference = models.CharField(max_length=100, db_index=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=12, choices=STATUSES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        unique_together = ("provider", "event_key")
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='payevent_status_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.provider} {self.event_type} {self.reference} ({self.status})"
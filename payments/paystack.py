@@ -0,0 +1,160 @@
+"""
+Pooled HTTP client for the Paystack API.
+
+All calls share one module-level ``requests.Session`` per process, so
+connections to api.paystack.co are kept alive and reused instead of paying a
+TCP+TLS handshake per request. Timeouts are tight so a slow upstream cannot
+hold a worker for long, and verify (an idempotent GET) is retried on
+connection errors and 5xx responses. Per-operation latency, errors and
+retries are recorded: retried or failed calls are logged as warnings, and
+the batch commands (reconcile_payments, process_payment_events) print a
+``metrics_summary()`` for the calls they made.
+"""
+import logging
+import threading
+import time
+from urllib import parse as urlparse
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+class PaystackError(Exception):
+    """Raised when Paystack cannot be reached or returns an error response."""
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    retry = Retry(
+        total=getattr(settings, 'PAYSTACK_MAX_RETRIES', 2),
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 503, 504),
+        # Only idempotent reads are retried after the request reached Paystack
+        allowed_methods=frozenset({'GET'}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=getattr(settings, 'PAYSTACK_POOL_SIZE', 10),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept': 'application/json'})
+    return session
+
+
+def get_session():
+    """Return the process-wide Paystack session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def close_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def _record(operation, elapsed_ms, ok, retries=0):
+    with _metrics_lock:
+        stats = _metrics.setdefault(
+            operation, {'calls': 0, 'errors': 0, 'retries': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+        )
+        stats['calls'] += 1
+        stats['retries'] += retries
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        if not ok:
+            stats['errors'] += 1
+    if ok and not retries:
+        logger.debug("paystack %s took %.1fms", operation, elapsed_ms)
+    else:
+        logger.warning(
+            "paystack %s took %.1fms after %d retries (%s)", operation, elapsed_ms, retries, 'ok' if ok else 'error'
+        )
+
+
+def get_metrics():
+    """Return a snapshot of per-operation call counts, errors and latency."""
+    with _metrics_lock:
+        return {
+            operation: dict(stats, avg_ms=stats['total_ms'] / stats['calls'] if stats['calls'] else 0.0)
+            for operation, stats in _metrics.items()
+        }
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def metrics_summary():
+    """One human-readable line per operation, for command output."""
+    return [
+        f"Paystack {operation}: {stats['calls']} call(s), {stats['errors']} error(s), "
+        f"{stats['retries']} retries, avg {stats['avg_ms']:.0f}ms, max {stats['max_ms']:.0f}ms"
+        for operation, stats in sorted(get_metrics().items())
+    ]
+
+
+def _retries(response):
+    # urllib3 keeps the Retry state (with one history entry per retry) on the raw response
+    retry_state = getattr(response.raw, 'retries', None)
+    return len(retry_state.history) if retry_state is not None else 0
+
+
+def _timeout():
+    return (
+        getattr(settings, 'PAYSTACK_CONNECT_TIMEOUT', 3.05),
+        getattr(settings, 'PAYSTACK_READ_TIMEOUT', 10),
+    )
+
+
+def _request(operation, method, path, **kwargs):
+    base_url = getattr(settings, 'PAYSTACK_BASE_URL', 'https://api.paystack.co').rstrip('/')
+    headers = {'Authorization': f"Bearer {getattr(settings, 'PAYSTACK_SECRET_KEY', '')}"}
+    started = time.monotonic()
+    ok = False
+    retries = 0
+    try:
+        response = get_session().request(
+            method, base_url + path, headers=headers, timeout=_timeout(), **kwargs
+        )
+        retries = _retries(response)
+        response.raise_for_status()
+        data = response.json()
+        ok = True
+        return data
+    except (requests.RequestException, ValueError) as e:
+        raise PaystackError(str(e)) from e
+    finally:
+        _record(operation, (time.monotonic() - started) * 1000, ok, retries)
+
+
+def initialize_transaction(payload: dict) -> dict:
+    """POST /transaction/initialize. Not retried, as it is not idempotent."""
+    return _request('initialize', 'POST', '/transaction/initialize', json=payload)
+
+
+def verify_transaction(reference: str) -> dict:
+    """GET /transaction/verify/<reference>, retried on transient failures."""
+    return _request('verify', 'GET', f'/transaction/verify/{urlparse.quote(reference)}')
@@ -0,0 +1,50 @@
+"""
+Payment fulfilment shared by the browser return views, webhooks and workers.
+
+Both transitions are conditional UPDATEs, so when the return view, a webhook
+and the reconciliation worker race on the same payment, exactly one of them
+moves it to successful and creates the subscription.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from memberships.models import Subscription
+from notifications.utils import notify_user
+
+from .models import Payment
+from .utils import send_payment_receipt
+
+
+def fulfil_payment(reference: str, response: dict | None = None):
+    """
+    Mark the payment ``reference`` successful and activate its subscription.
+    Returns the new subscription, or None if the payment was already fulfilled.
+    """
+    now = timezone.now()
+    changes = {'status': 'successful', 'completed_at': now, 'updated_at': now}
+    if response is not None:
+        changes['gateway_response'] = response
+
+    with transaction.atomic():
+        won = Payment.objects.filter(reference=reference).exclude(status='successful').update(**changes)
+        if not won:
+            return None
+        payment = Payment.objects.select_related('plan', 'user').get(reference=reference)
+        sub = Subscription.objects.create(user=payment.user, plan=payment.plan, payment=payment)
+
+    notify_user(payment.user, title='Payment Successful', body=f'Your payment for {payment.plan.name} was successful. Your membership is now active!')
+
+    # Send payment receipt via email
+    send_payment_receipt(payment, subscription=sub)
+    return sub
+
+
+def fail_payment(reference: str, response: dict | None = None):
+    """
+    Mark the payment ``reference`` failed unless it has already succeeded.
+    Returns True if the payment was updated.
+    """
+    changes = {'status': 'failed', 'updated_at': timezone.now()}
+    if response is not None:
+        changes['gateway_response'] = response
+    return bool(Payment.objects.filter(reference=reference).exclude(status='successful').update(**changes))
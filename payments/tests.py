@@ -0,0 +1,233 @@
+import hashlib
+import hmac
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from memberships.models import Plan, Subscription
+
+from . import paystack
+from .gateways import FakeGateway, GatewayError, PaymentGateway, PaystackGateway, StripeGateway
+from .models import Payment
+from .services import fulfil_payment
+from .webhooks import process_events, record_event
+
+
+@override_settings(
+    PAYMENT_PROVIDER='fake',
+    FAKE_GATEWAY_LATENCY=0,
+    FAKE_GATEWAY_FAILURE_RATE=0,
+    EMAIL_QUEUE_ENABLED=False,
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class ConcurrentFulfilmentTests(TransactionTestCase):
+    """The return view, webhook and event worker racing on one payment."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('racer', 'racer@example.com', 'secret')
+        plan = Plan.objects.create(name='Monthly', price=100, duration_days=30)
+        self.payment = Payment.objects.create(
+            user=self.user, plan=plan, amount=10000, currency='NGN', provider='fake', reference='M7_race',
+        )
+
+    def _run_concurrently(self, callables):
+        """Start every callable at the same moment; return the exceptions raised."""
+        barrier = threading.Barrier(len(callables))
+        errors = []
+
+        def run(fn):
+            try:
+                barrier.wait()
+                fn()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(fn,)) for fn in callables]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_return_view_webhook_and_worker_fulfil_once(self):
+        reference = self.payment.reference
+        body = json.dumps({'reference': reference}).encode()
+        record_event('fake', reference, {'event': 'charge.success', 'data': {'id': 1, 'reference': reference}})
+        responses = []
+
+        def return_view():
+            client = Client()
+            client.force_login(self.user)
+            responses.append(client.get(reverse('payments:fake_callback'), {'reference': reference}).status_code)
+
+        def webhook():
+            responses.append(Client().post(
+                reverse('payments:fake_webhook'), data=body, content_type='application/json',
+                HTTP_X_FAKE_SIGNATURE=FakeGateway.sign(body),
+            ).status_code)
+
+        def worker():
+            process_events()
+
+        errors = self._run_concurrently([return_view, webhook, worker] * 4)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(set(responses)), [200, 302])
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, 'successful')
+        self.assertEqual(Subscription.objects.filter(payment=self.payment).count(), 1)
+
+    def test_concurrent_fulfil_payment_creates_one_subscription(self):
+        results = []
+        errors = self._run_concurrently([
+            lambda: results.append(fulfil_payment(self.payment.reference, {'thread': True}))
+            for _ in range(10)
+        ])
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len([sub for sub in results if sub is not None]), 1)
+        self.assertEqual(Subscription.objects.filter(payment=self.payment).count(), 1)
+
+
+class StubPaystackHandler(BaseHTTPRequestHandler):
+    """Answers like Paystack; ``server.script`` lists (status, delay) per request."""
+    protocol_version = 'HTTP/1.1'  # keep-alive, so connection reuse is observable
+
+    def _respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        self.server.requests.append((self.command, self.path, self.client_address[1]))
+        status, delay = self.server.script.pop(0) if self.server.script else (200, 0)
+        if delay:
+            time.sleep(delay)
+        body = json.dumps({'status': status == 200, 'data': {'status': 'success'}}).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (timeout test)
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class PaystackClientTests(SimpleTestCase):
+    """The pooled Paystack client against a local stub server."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubPaystackHandler)
+        self.server.requests = []
+        self.server.script = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.settings_override = override_settings(
+            PAYSTACK_BASE_URL=f'http://127.0.0.1:{self.server.server_port}',
+            PAYSTACK_MAX_RETRIES=2,
+            PAYSTACK_READ_TIMEOUT=0.5,
+        )
+        self.settings_override.enable()
+        # The session is built from settings on first use
+        paystack.close_session()
+        paystack.reset_metrics()
+
+    def tearDown(self):
+        paystack.close_session()
+        self.settings_override.disable()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_calls_reuse_one_keep_alive_connection(self):
+        for i in range(5):
+            paystack.verify_transaction(f'ref-{i}')
+        paystack.initialize_transaction({'reference': 'ref-new'})
+
+        self.assertEqual(len(self.server.requests), 6)
+        self.assertEqual(len({port for _, _, port in self.server.requests}), 1)
+        self.assertEqual(paystack.get_metrics()['verify']['calls'], 5)
+
+    def test_verify_retries_server_errors(self):
+        self.server.script = [(503, 0), (502, 0)]
+        with self.assertLogs('payments.paystack', 'WARNING'):
+            data = paystack.verify_transaction('ref-retry')
+
+        self.assertTrue(data['status'])
+        self.assertEqual(len(self.server.requests), 3)
+        metrics = paystack.get_metrics()['verify']
+        self.assertEqual((metrics['calls'], metrics['retries'], metrics['errors']), (1, 2, 0))
+
+    def test_verify_gives_up_after_max_retries(self):
+        self.server.script = [(503, 0)] * 3
+        with self.assertLogs('payments.paystack', 'WARNING'), self.assertRaises(paystack.PaystackError):
+            paystack.verify_transaction('ref-down')
+
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(paystack.get_metrics()['verify']['errors'], 1)
+
+    def test_initialize_is_not_retried(self):
+        self.server.script = [(503, 0)]
+        with self.assertLogs('payments.paystack', 'WARNING'), self.assertRaises(paystack.PaystackError):
+            paystack.initialize_transaction({'reference': 'ref-once'})
+
+        self.assertEqual([method for method, _, _ in self.server.requests], ['POST'])
+
+    @override_settings(PAYSTACK_MAX_RETRIES=0)
+    def test_slow_response_times_out(self):
+        paystack.close_session()
+        self.server.script = [(200, 1.5)]
+        started = time.monotonic()
+        with self.assertLogs('payments.paystack', 'WARNING'), self.assertRaises(paystack.PaystackError):
+            paystack.verify_transaction('ref-slow')
+
+        self.assertLess(time.monotonic() - started, 1.5)
+
+
+class GatewayContractTests(SimpleTestCase):
+    """Gateway interface and webhook signature checks."""
+
+    def paystack_webhook(self, body, secret):
+        signature = hmac.new(secret.encode(), body, hashlib.sha512).hexdigest()
+        return RequestFactory().post(
+            '/webhook/', data=body, content_type='application/json', HTTP_X_PAYSTACK_SIGNATURE=signature,
+        )
+
+    def test_incomplete_gateway_fails_at_instantiation(self):
+        class HalfGateway(PaymentGateway):
+            def initialize(self, payment):
+                pass
+
+        with self.assertRaises(TypeError):
+            HalfGateway()
+
+    @override_settings(PAYSTACK_SECRET_KEY='sk_test')
+    def test_paystack_webhook_checks_signature(self):
+        body = json.dumps({'event': 'charge.success', 'data': {'reference': 'M7_ok'}}).encode()
+
+        result = PaystackGateway().parse_webhook(self.paystack_webhook(body, 'sk_test'))
+        self.assertEqual((result.reference, result.status), ('M7_ok', 'success'))
+        with self.assertRaises(GatewayError):
+            PaystackGateway().parse_webhook(self.paystack_webhook(body, 'sk_other'))
+
+    @override_settings(PAYSTACK_SECRET_KEY='')
+    def test_paystack_webhook_rejected_without_secret(self):
+        body = json.dumps({'event': 'charge.success', 'data': {'reference': 'M7_forged'}}).encode()
+        with self.assertRaisesMessage(GatewayError, 'not configured'):
+            PaystackGateway().parse_webhook(self.paystack_webhook(body, ''))
+
+    @override_settings(STRIPE_WEBHOOK_SECRET='')
+    def test_stripe_webhook_rejected_without_secret(self):
+        request = RequestFactory().post('/webhook/', data=b'{}', content_type='application/json')
+        with self.assertRaisesMessage(GatewayError, 'not configured'):
+            StripeGateway().parse_webhook(request)
@@ -6,7 +6,10 @@ app_name = 'payments'
 urlpatterns = [
     path('initiate/<int:plan_id>/', views.initiate_payment, name='initiate'),
     path('paystack/callback/', views.paystack_callback, name='paystack_callback'),
+    path('paystack/webhook/', views.paystack_webhook, name='paystack_webhook'),
     path('stripe/success/', views.stripe_success, name='stripe_success'),
     path('stripe/cancel/', views.stripe_cancel, name='stripe_cancel'),
     path('stripe/webhook/', views.stripe_webhook, name='stripe_webhook'),
+    path('fake/callback/', views.fake_callback, name='fake_callback'),
+    path('fake/webhook/', views.fake_webhook, name='fake_webhook'),
 ]
@@ -6,6 +6,8 @@ from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from decimal import Decimal
 
+from notifications.mail_queue import enqueue_message, queue_enabled
+
 
 def get_currency_symbol(currency_code: str = 'NGN') -> str:
     """
@@ -32,7 +34,7 @@ def send_payment_receipt(payment, subscription=None):
         subscription: Subscription object (optional)
 
     Returns:
-        bool: True if email was sent successfully, False otherwise
+        bool: True if email was sent (or queued) successfully, False otherwise
     """
     if not payment.user.email:
         return False
@@ -109,9 +111,12 @@ This is an automated receipt. Please keep it for your records.
     # Attach HTML version
     email.attach_alternative(html_content, "text/html")
 
-    # Send email
+    # Queue for background delivery when enabled, otherwise send now
     try:
-        email.send(fail_silently=False)
+        if queue_enabled():
+            enqueue_message(email)
+        else:
+            email.send(fail_silently=False)
         return True
     except Exception as e:
         # Log the error (in production, use proper logging)
@@ -1,30 +1,64 @@
-import json
 import secrets
-import requests
-from urllib import parse as urlparse
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseBadRequest
+from django.http import Http404, HttpResponse, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, redirect
-from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
-from memberships.models import Plan, Subscription
+from memberships.models import Plan
 from decimal import Decimal
-from notifications.utils import notify_user
+from .gateways import GatewayError, get_gateway
 from .models import Payment
-from .utils import send_payment_receipt
+from .services import fail_payment, fulfil_payment
+from .webhooks import record_event
 
 
 def _make_reference(prefix: str = "M7"):
     return f"{prefix}_{secrets.token_hex(8)}"
 
 
-def _post_json(url: str, payload: dict, headers: dict) -> dict:
-    response = requests.post(url, json=payload, headers=headers, timeout=30)
-    response.raise_for_status()
-    return response.json()
+def _complete_return(request, provider: str):
+    """Verify the payment a member returned from checkout with and activate it."""
+    try:
+        result = get_gateway(provider).verify_return(request)
+    except GatewayError as e:
+        messages.error(request, str(e))
+        return redirect('memberships:plans')
+    payment = get_object_or_404(Payment, reference=result.reference, provider=provider, user=request.user)
+    if result.succeeded:
+        sub = fulfil_payment(payment.reference, result.data)
+        if sub:
+            messages.success(request, f'Payment successful. Subscription active until {sub.end_date}.')
+        else:
+            messages.success(request, 'Payment already confirmed.')
+        return redirect('memberships:dashboard')
+    fail_payment(payment.reference, result.data)
+    messages.error(request, 'Payment failed or cancelled.')
+    return redirect('memberships:plans')
+
+
+def _handle_webhook(request, provider: str):
+    try:
+        result = get_gateway(provider).parse_webhook(request)
+    except GatewayError as e:
+        return HttpResponseBadRequest(str(e))
+    if result and result.succeeded:
+        payment = Payment.objects.select_related('plan', 'user').filter(
+            reference=result.reference, provider=provider
+        ).first()
+        if payment:
+            fulfil_payment(payment.reference, result.data)
+    # Return a 200 so the provider considers the webhook delivered
+    return HttpResponse(status=200)
+
+
+def _require_fake_provider():
+    # The fake gateway can mark payments successful; never expose it otherwise
+    if getattr(settings, 'PAYMENT_PROVIDER', 'paystack') != 'fake':
+        raise Http404
 
 
 @login_required
@@ -50,150 +84,29 @@ def initiate_payment(request, plan_id: int):
         reference=reference,
     )
 
-    if provider == 'paystack':
-        secret = getattr(settings, 'PAYSTACK_SECRET_KEY', '')
-        if not secret:
-            messages.error(request, 'Payment gateway not configured.')
-            payment.mark_failed({'error': 'Missing PAYSTACK_SECRET_KEY'})
-            return redirect('memberships:plans')
-        init_url = 'https://api.paystack.co/transaction/initialize'
-        callback_url = settings.SITE_URL + reverse('payments:paystack_callback')
-        payload = {
-            'email': request.user.email or 'placeholder@example.com',
-            'amount': amount_minor,
-            'currency': currency,
-            'reference': reference,
-            'callback_url': callback_url,
-            'metadata': {'plan_id': plan.id, 'user_id': request.user.id},
-        }
-        headers = {
-            'Authorization': f'Bearer {secret}',
-            'Content-Type': 'application/json',
-            'Accept': 'application/json',
-        }
-        try:
-            resp = _post_json(init_url, payload, headers)
-        except Exception as e:
-            payment.mark_failed({'exception': str(e)})
-            messages.error(request, f'Could not connect to Paystack: {str(e)}')
-            return redirect('memberships:plans')
-        if resp.get('status') and resp.get('data', {}).get('authorization_url'):
-            auth_url = resp['data']['authorization_url']
-            return redirect(auth_url)
-        payment.mark_failed(resp)
-        messages.error(request, 'Payment initialization failed.')
+    try:
+        gateway = get_gateway(provider)
+        checkout = gateway.initialize(payment)
+    except GatewayError as e:
+        payment.mark_failed({'error': str(e)})
+        messages.error(request, str(e))
         return redirect('memberships:plans')
 
-    elif provider == 'stripe':
-        try:
-            import stripe
-        except Exception:
-            messages.error(request, 'Stripe library not installed.')
-            payment.mark_failed({'error': 'stripe_not_installed'})
-            return redirect('memberships:plans')
-        stripe.api_key = getattr(settings, 'STRIPE_SECRET_KEY', '')
-        if not stripe.api_key:
-            messages.error(request, 'Stripe not configured.')
-            payment.mark_failed({'error': 'missing_stripe_secret'})
-            return redirect('memberships:plans')
-        success_url = settings.SITE_URL + reverse('payments:stripe_success') + '?session_id={CHECKOUT_SESSION_ID}'
-        cancel_url = settings.SITE_URL + reverse('payments:stripe_cancel')
-        try:
-            session = stripe.checkout.Session.create(
-                mode='payment',
-                payment_method_types=['card'],
-                line_items=[{
-                    'price_data': {
-                        'currency': currency.lower(),
-                        'product_data': {'name': f"{plan.name} Membership"},
-                        'unit_amount': amount_minor,
-                    },
-                    'quantity': 1,
-                }],
-                metadata={'reference': reference, 'plan_id': plan.id, 'user_id': request.user.id},
-                success_url=success_url,
-                cancel_url=cancel_url,
-                client_reference_id=reference,
-            )
-        except Exception as e:
-            payment.mark_failed({'exception': str(e)})
-            messages.error(request, 'Stripe session creation failed.')
-            return redirect('memberships:plans')
-        return redirect(session.url)
-
-    else:
-        messages.error(request, 'Unsupported payment provider.')
-        payment.mark_failed({'error': 'unsupported_provider'})
-        return redirect('memberships:plans')
+    if checkout.data:
+        # Keep provider identifiers (e.g. the Stripe session) for later verification
+        payment.gateway_response = checkout.data
+        payment.save(update_fields=['gateway_response', 'updated_at'])
+    return redirect(checkout.redirect_url)
 
 
 @login_required
 def paystack_callback(request):
-    reference = request.GET.get('reference')
-    if not reference:
-        return HttpResponseBadRequest('Missing reference')
-    payment = get_object_or_404(Payment, reference=reference, provider='paystack', user=request.user)
-    verify_url = f'https://api.paystack.co/transaction/verify/{urlparse.quote(reference)}'
-    headers = {'Authorization': f'Bearer {getattr(settings, "PAYSTACK_SECRET_KEY", "")}', 'Accept': 'application/json'}
-    try:
-        resp = requests.get(verify_url, headers=headers, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-    except Exception as e:
-        messages.error(request, 'Could not verify Paystack transaction.')
-        payment.mark_failed({'exception': str(e)})
-        return redirect('memberships:plans')
-    if data.get('status') and data.get('data', {}).get('status') == 'success':
-        payment.mark_success(data)
-        # On success, create subscription and link payment
-        sub = Subscription.objects.create(user=request.user, plan=payment.plan, payment=payment)
-        messages.success(request, f'Payment successful. Subscription active until {sub.end_date}.')
-        notify_user(request.user, title='Payment Successful', body=f'Your payment for {payment.plan.name} was successful. Your membership is now active!')
-
-        # Send payment receipt via email
-        send_payment_receipt(payment, subscription=sub)
-
-        return redirect('memberships:dashboard')
-    else:
-        payment.mark_failed(data)
-        messages.error(request, 'Payment failed or cancelled.')
-        return redirect('memberships:plans')
+    return _complete_return(request, 'paystack')
 
 
 @login_required
 def stripe_success(request):
-    session_id = request.GET.get('session_id')
-    if not session_id:
-        return HttpResponseBadRequest('Missing session_id')
-    try:
-        import stripe
-    except Exception:
-        messages.error(request, 'Stripe not available.')
-        return redirect('memberships:plans')
-    stripe.api_key = getattr(settings, 'STRIPE_SECRET_KEY', '')
-    try:
-        session = stripe.checkout.Session.retrieve(session_id)
-    except Exception as e:
-        messages.error(request, 'Unable to verify Stripe session.')
-        return redirect('memberships:plans')
-    reference = session.get('client_reference_id')
-    payment = get_object_or_404(Payment, reference=reference, provider='stripe', user=request.user)
-    if session.get('payment_status') == 'paid':
-        if payment.status != 'successful':
-            payment.mark_success({'session': session.id})
-            sub = Subscription.objects.create(user=request.user, plan=payment.plan, payment=payment)
-            messages.success(request, f'Payment successful. Subscription active until {sub.end_date}.')
-            notify_user(request.user, title='Payment Successful', body=f'Your payment for {payment.plan.name} was successful. Your membership is now active!')
-
-            # Send payment receipt via email
-            send_payment_receipt(payment, subscription=sub)
-        else:
-            messages.success(request, 'Payment already confirmed.')
-        return redirect('memberships:dashboard')
-    else:
-        payment.mark_failed({'session': session.id, 'payment_status': session.get('payment_status')})
-        messages.error(request, 'Payment not completed.')
-        return redirect('memberships:plans')
+    return _complete_return(request, 'stripe')
 
 
 @login_required
@@ -202,40 +115,36 @@ def stripe_cancel(request):
     return redirect('memberships:plans')
 
 
-def stripe_webhook(request):
+@csrf_exempt
+@require_POST
+def paystack_webhook(request):
+    """
+    Record a signed Paystack event and acknowledge it immediately.
+    Verification and fulfilment happen in process_payment_events.
+    """
     try:
-        import stripe
-    except Exception:
-        return HttpResponseBadRequest('Stripe not available')
-    webhook_secret = getattr(settings, 'STRIPE_WEBHOOK_SECRET', '')
-    payload = request.body
-    sig_header = request.META.get('HTTP_STRIPE_SIGNATURE', '')
-    try:
-        if webhook_secret:
-            event = stripe.Webhook.construct_event(payload=payload, sig_header=sig_header, secret=webhook_secret)
-        else:
-            event = json.loads(payload.decode('utf-8'))
-    except Exception:
-        return HttpResponseBadRequest('Invalid payload or signature')
-
-    event_type = event['type'] if isinstance(event, dict) else event.type
-    data = event['data']['object'] if isinstance(event, dict) else event.data.object
-
-    if event_type == 'checkout.session.completed':
-        reference = data.get('client_reference_id') or (data.get('metadata') or {}).get('reference')
-        if reference:
-            try:
-                payment = Payment.objects.select_related('plan', 'user').get(reference=reference, provider='stripe')
-            except Payment.DoesNotExist:
-                payment = None
-            if payment and payment.status != 'successful':
-                payment.mark_success({'webhook': True, 'session': data.get('id')})
-                sub = Subscription.objects.create(user=payment.user, plan=payment.plan, payment=payment)
-                notify_user(payment.user, title='Payment Successful', body=f'Your payment for {payment.plan.name} was successful. Your membership is now active!')
-
-                # Send payment receipt via email
-                send_payment_receipt(payment, subscription=sub)
-
-    # Return a 200 so Stripe considers the webhook delivered
-    from django.http import HttpResponse
+        result = get_gateway('paystack').parse_webhook(request)
+    except GatewayError as e:
+        return HttpResponseBadRequest(str(e))
+    if result is not None:
+        record_event('paystack', result.reference, result.data)
     return HttpResponse(status=200)
+
+
+@csrf_exempt
+@require_POST
+def stripe_webhook(request):
+    return _handle_webhook(request, 'stripe')
+
+
+@login_required
+def fake_callback(request):
+    _require_fake_provider()
+    return _complete_return(request, 'fake')
+
+
+@csrf_exempt
+@require_POST
+def fake_webhook(request):
+    _require_fake_provider()
+    return _handle_webhook(request, 'fake')
@@ -0,0 +1,126 @@
+"""
+Asynchronous processing of provider webhooks.
+
+The webhook view only validates the signature and records a PaymentEvent,
+which costs one INSERT. The process_payment_events command (run from cron)
+then verifies each event with the provider, fulfils or fails the payment and
+sends the receipt off the request path. Events that cannot be verified yet
+are retried with backoff.
+"""
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core import work_queue
+
+from .gateways import GatewayError, get_gateway
+from .models import Payment, PaymentEvent
+from .services import fail_payment, fulfil_payment
+
+logger = logging.getLogger(__name__)
+
+
+def event_key(payload: dict) -> str:
+    """Stable identity for a webhook delivery, used to drop duplicates."""
+    data = payload.get('data') or {}
+    if payload.get('event') and data.get('id'):
+        return f"{payload['event']}:{data['id']}"
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def record_event(provider: str, reference: str, payload: dict):
+    """
+    Store a webhook event once. Returns (event, created); a redelivery of an
+    already recorded event returns the existing row with created=False.
+    """
+    key = event_key(payload)
+    try:
+        with transaction.atomic():
+            event = PaymentEvent.objects.create(
+                provider=provider,
+                event_key=key,
+                event_type=payload.get('event', '')[:100],
+                reference=reference,
+                payload=payload,
+            )
+        return event, True
+    except IntegrityError:
+        return PaymentEvent.objects.get(provider=provider, event_key=key), False
+
+
+def retry_delay(attempts):
+    """Exponential backoff starting at one minute, capped at one hour."""
+    return work_queue.retry_delay(attempts, max_seconds=60 * 60)
+
+
+def claim_batch(batch_size):
+    """Lock up to ``batch_size`` due events for this worker and return them."""
+    return work_queue.claim_batch(PaymentEvent, batch_size, 'processing')
+
+
+def _finish(event, status, error=''):
+    event.status = status
+    event.last_error = error
+    event.locked_at = None
+    event.processed_at = timezone.now()
+    event.save(update_fields=['status', 'last_error', 'locked_at', 'processed_at'])
+
+
+def _retry(event, error, max_attempts):
+    return work_queue.schedule_retry(event, error, max_attempts, 'failed', delay=retry_delay)
+
+
+def process_event(event, max_attempts):
+    """
+    Verify one event with its provider and apply the outcome to the payment.
+    Returns the event's resulting status.
+    """
+    payment = Payment.objects.filter(reference=event.reference, provider=event.provider).first()
+    if payment is None:
+        _finish(event, 'ignored', 'Unknown payment reference')
+        return 'ignored'
+    if payment.status == 'successful':
+        _finish(event, 'processed')
+        return 'processed'
+
+    try:
+        # Never trust the webhook body alone; ask the provider
+        result = get_gateway(event.provider).verify(payment)
+    except GatewayError as e:
+        logger.warning("Verifying payment event %s failed: %s", event.pk, e)
+        return _retry(event, str(e), max_attempts)
+
+    if result.succeeded:
+        fulfil_payment(payment.reference, result.data)
+    elif result.status == 'failed':
+        fail_payment(payment.reference, result.data)
+    else:
+        return _retry(event, 'Payment still pending at provider', max_attempts)
+    _finish(event, 'processed')
+    return 'processed'
+
+
+def process_events(batch_size=50, max_batches=None, max_attempts=None):
+    """
+    Process due events until none are left (or ``max_batches`` is reached).
+
+    Returns a dict of totals keyed by resulting event status.
+    """
+    max_attempts = max_attempts or getattr(settings, 'PAYMENT_EVENT_MAX_ATTEMPTS', 8)
+    totals = {'processed': 0, 'ignored': 0, 'pending': 0, 'failed': 0}
+
+    def process(events):
+        for event in events:
+            try:
+                status = process_event(event, max_attempts)
+            except Exception as e:
+                logger.exception("Payment event %s failed", event.pk)
+                status = _retry(event, str(e), max_attempts)
+            totals[status] += 1
+
+    work_queue.drain(lambda: claim_batch(batch_size), process, max_batches)
+    return totals
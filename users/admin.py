@@ -1,7 +1,7 @@
-import csv
 from django.contrib import admin
 from django.contrib.auth import get_user_model
-from django.http import HttpResponse
+from core.jobs import background_export_action
+from . import exports
 from .models import MemberProfile
 
 User = get_user_model()
@@ -38,7 +38,13 @@ class CustomUserAdmin(admin.ModelAdmin):
     # Disable date_hierarchy to avoid MySQL timezone table requirement on cPanel
     # date_hierarchy = 'date_joined'
     ordering = ('-date_joined',)
-    actions = ['export_users_csv', 'export_users_with_subscriptions_csv']
+    actions = [
+        'export_users_csv',
+        'export_users_with_subscriptions_csv',
+        background_export_action('users', "Export selected users in the background"),
+        background_export_action('users_subscriptions', "Export users with subscription details in the background"),
+        background_export_action('users_subscriptions', "Export users with subscription details in the background (gzip)", compress=True),
+    ]
 
     # Safe boolean display to avoid KeyError when DB stores '1'/'0' as TEXT
     def is_active_icon(self, obj):
@@ -76,98 +82,12 @@ class CustomUserAdmin(admin.ModelAdmin):
 
     def export_users_csv(self, request, queryset):
         """Export selected users basic information to CSV"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'users_export_{timestamp}.csv'
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        writer = csv.writer(response)
-        writer.writerow([
-            'User ID', 'Username', 'Email', 'First Name', 'Last Name',
-            'Phone', 'Date of Birth', 'Address', 'Is Active', 'Date Joined', 'Last Login'
-        ])
-
-        for user in queryset:
-            try:
-                profile = user.profile
-                phone = profile.phone
-                dob = profile.date_of_birth
-                address = profile.address
-            except:
-                phone = 'N/A'
-                dob = 'N/A'
-                address = 'N/A'
-
-            writer.writerow([
-                user.id,
-                user.username,
-                user.email,
-                user.first_name,
-                user.last_name,
-                phone,
-                dob,
-                address,
-                'Yes' if user.is_active else 'No',
-                user.date_joined,
-                user.last_login or 'Never',
-            ])
-
-        return response
+        return exports.users.stream(queryset)
     export_users_csv.short_description = "Export selected users to CSV"
 
     def export_users_with_subscriptions_csv(self, request, queryset):
         """Export selected users with their subscription details to CSV"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'users_subscriptions_export_{timestamp}.csv'
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        writer = csv.writer(response)
-        writer.writerow([
-            'User ID', 'Username', 'Email', 'First Name', 'Last Name',
-            'Phone', 'Active Subscription', 'Plan Name', 'Subscription Status',
-            'Start Date', 'End Date', 'Days Remaining', 'Total Workouts',
-            'Date Joined', 'Last Login'
-        ])
-
-        for user in queryset:
-            # Get profile info
-            try:
-                profile = user.profile
-                phone = profile.phone
-            except:
-                phone = 'N/A'
-
-            # Get active subscription
-            from memberships.models import Subscription, WorkoutLog
-            active_sub = Subscription.objects.filter(user=user).order_by('-created_at').first()
-
-            # Get workout count
-            workout_count = WorkoutLog.objects.filter(user=user).count()
-
-            writer.writerow([
-                user.id,
-                user.username,
-                user.email,
-                user.first_name,
-                user.last_name,
-                phone,
-                'Yes' if active_sub else 'No',
-                active_sub.plan.name if active_sub else 'N/A',
-                active_sub.status if active_sub else 'N/A',
-                active_sub.start_date if active_sub else 'N/A',
-                active_sub.end_date if active_sub else 'N/A',
-                active_sub.days_remaining if active_sub else 'N/A',
-                workout_count,
-                user.date_joined,
-                user.last_login or 'Never',
-            ])
-
-        return response
+        return exports.users_subscriptions.stream(queryset)
     export_users_with_subscriptions_csv.short_description = "Export users with subscription details to CSV"
 
 
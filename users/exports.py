@@ -0,0 +1,124 @@
+"""
+Export definitions for member accounts, used by the admin CSV actions and
+background export jobs.
+"""
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Case, Count, OuterRef, Subquery, When
+from django.utils import timezone
+
+from core.exports import Exporter, register
+
+
+def _user_row(user):
+    try:
+        profile = user.profile
+        phone = profile.phone
+        dob = profile.date_of_birth
+        address = profile.address
+    except ObjectDoesNotExist:
+        phone = 'N/A'
+        dob = 'N/A'
+        address = 'N/A'
+
+    return [
+        user.id,
+        user.username,
+        user.email,
+        user.first_name,
+        user.last_name,
+        phone,
+        dob,
+        address,
+        'Yes' if user.is_active else 'No',
+        user.date_joined,
+        user.last_login or 'Never',
+    ]
+
+
+users = register(Exporter(
+    name='users',
+    label='Users',
+    model=settings.AUTH_USER_MODEL,
+    header=[
+        'User ID', 'Username', 'Email', 'First Name', 'Last Name',
+        'Phone', 'Date of Birth', 'Address', 'Is Active', 'Date Joined', 'Last Login'
+    ],
+    row=_user_row,
+    prepare=lambda queryset: queryset.select_related('profile'),
+))
+
+
+def _user_subscription_row(user):
+    # The profile's current subscription, or for users without a profile row
+    # (legacy accounts) the latest_* fields annotated by the prepare function
+    try:
+        profile = user.profile
+    except ObjectDoesNotExist:
+        profile = None
+    if profile is not None:
+        phone = profile.phone
+        sub = profile.current_subscription
+        subscription = sub and [sub.plan.name, sub.current_status, sub.start_date, sub.end_date, sub.days_remaining]
+    else:
+        phone = 'N/A'
+        subscription = user.latest_plan_name is not None and [
+            user.latest_plan_name,
+            user.latest_status,
+            user.latest_start_date,
+            user.latest_end_date,
+            (user.latest_end_date - timezone.localdate()).days,
+        ]
+
+    return [
+        user.id,
+        user.username,
+        user.email,
+        user.first_name,
+        user.last_name,
+        phone,
+        'Yes' if subscription else 'No',
+        *(subscription or ['N/A'] * 5),
+        user.workout_count,
+        user.date_joined,
+        user.last_login or 'Never',
+    ]
+
+
+def _prepare_user_subscriptions(queryset):
+    # One query: the profile's current-subscription pointer gives the latest
+    # subscription and plan via joins, and workouts are counted in SQL. Users
+    # without a profile row get the latest subscription's fields from
+    # subqueries, which the CASE only evaluates for them.
+    from memberships.models import Subscription
+
+    latest = Subscription.objects.filter(user=OuterRef('pk')).with_live_status().order_by('-created_at')
+
+    def for_users_without_profile(field):
+        return Case(When(profile__isnull=True, then=Subquery(latest.values(field)[:1])))
+
+    return (
+        queryset.select_related('profile__current_subscription__plan')
+        .annotate(
+            workout_count=Count('workout_logs'),
+            latest_plan_name=for_users_without_profile('plan__name'),
+            latest_status=for_users_without_profile('live_status'),
+            latest_start_date=for_users_without_profile('start_date'),
+            latest_end_date=for_users_without_profile('end_date'),
+        )
+    )
+
+
+users_subscriptions = register(Exporter(
+    name='users_subscriptions',
+    label='Users with subscriptions',
+    model=settings.AUTH_USER_MODEL,
+    header=[
+        'User ID', 'Username', 'Email', 'First Name', 'Last Name',
+        'Phone', 'Active Subscription', 'Plan Name', 'Subscription Status',
+        'Start Date', 'End Date', 'Days Remaining', 'Total Workouts',
+        'Date Joined', 'Last Login'
+    ],
+    row=_user_subscription_row,
+    prepare=_prepare_user_subscriptions,
+))
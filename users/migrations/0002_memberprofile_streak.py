@@ -0,0 +1,54 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:52
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_streaks(apps, schema_editor):
+    MemberProfile = apps.get_model('users', 'MemberProfile')
+    WorkoutLog = apps.get_model('memberships', 'WorkoutLog')
+
+    for profile in MemberProfile.objects.all():
+        dates = (
+            WorkoutLog.objects.filter(user_id=profile.user_id)
+            .order_by('-date')
+            .values_list('date', flat=True)
+            .distinct()
+        )
+        streak = 0
+        last_date = None
+        expected = None
+        for workout_date in dates:
+            if last_date is None:
+                last_date = expected = workout_date
+            if workout_date != expected:
+                break
+            streak += 1
+            expected = workout_date - timedelta(days=1)
+        if last_date is not None:
+            profile.current_streak = streak
+            profile.last_workout_date = last_date
+            profile.save(update_fields=['current_streak', 'last_workout_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('memberships', '0005_workoutlog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memberprofile',
+            name='current_streak',
+            field=models.PositiveIntegerField(default=0, help_text='Consecutive days with a workout, ending on last_workout_date'),
+        ),
+        migrations.AddField(
+            model_name='memberprofile',
+            name='last_workout_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_streaks, migrations.RunPython.noop),
+    ]
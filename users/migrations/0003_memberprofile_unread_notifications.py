@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:55
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_unread_counts(apps, schema_editor):
+    MemberProfile = apps.get_model('users', 'MemberProfile')
+    Notification = apps.get_model('notifications', 'Notification')
+
+    counts = (
+        Notification.objects.filter(is_read=False)
+        .order_by()
+        .values('user_id')
+        .annotate(unread=Count('id'))
+    )
+    for row in counts:
+        MemberProfile.objects.filter(user_id=row['user_id']).update(unread_notifications=row['unread'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_memberprofile_streak'),
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memberprofile',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def backfill_current_subscription(apps, schema_editor):
+    MemberProfile = apps.get_model('users', 'MemberProfile')
+    Subscription = apps.get_model('memberships', 'Subscription')
+
+    latest_end = dict(
+        Subscription.objects.order_by()
+        .values('user_id')
+        .annotate(latest=Max('end_date'))
+        .values_list('user_id', 'latest')
+    )
+    current = {}
+    for user_id, pk in Subscription.objects.order_by('user_id', 'created_at', 'pk').values_list('user_id', 'pk'):
+        current[user_id] = pk
+    for user_id, pk in current.items():
+        MemberProfile.objects.filter(user_id=user_id).update(
+            current_subscription_id=pk, active_until=latest_end.get(user_id)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memberships', '0010_subscription_end_date_index'),
+        ('users', '0003_memberprofile_unread_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memberprofile',
+            name='active_until',
+            field=models.DateField(blank=True, help_text='Latest end date across all subscriptions', null=True),
+        ),
+        migrations.AddField(
+            model_name='memberprofile',
+            name='current_subscription',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='memberships.subscription'),
+        ),
+        migrations.RunPython(backfill_current_subscription, migrations.RunPython.noop),
+    ]
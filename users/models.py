@@ -8,6 +8,18 @@ class MemberProfile(models.Model):
     address = models.CharField(max_length=255, blank=True)
     date_of_birth = models.DateField(null=True, blank=True)
 
+    # Workout streak, maintained incrementally when workouts are logged
+    current_streak = models.PositiveIntegerField(default=0, help_text='Consecutive days with a workout, ending on last_workout_date')
+    last_workout_date = models.DateField(null=True, blank=True)
+
+    # Denormalized count of unread notifications, kept by notifications.utils
+    unread_notifications = models.PositiveIntegerField(default=0)
+
+    # Pointer to the latest subscription, kept by memberships.subscriptions
+    current_subscription = models.ForeignKey(
+        'memberships.Subscription', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    active_until = models.DateField(null=True, blank=True, help_text='Latest end date across all subscriptions')
+
     def __str__(self):
         return f"Profile for {self.user.username}"
-
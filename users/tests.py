@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from memberships.models import Plan, Subscription, WorkoutLog
+
+from . import exports
+from .models import MemberProfile
+
+
+class UsersSubscriptionsExportTests(TestCase):
+    """The users-with-subscriptions export runs a fixed number of queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.plan = Plan.objects.create(name='Monthly', price=100, duration_days=30)
+        cls.today = timezone.localdate()
+
+    def _add_members(self, count, offset=0, with_profile=True):
+        # Bulk inserts skip the signals, so profiles are created only when asked
+        User = get_user_model()
+        users = User.objects.bulk_create([
+            User(username=f'member{i}', email=f'member{i}@example.com') for i in range(offset, offset + count)
+        ])
+        users = list(User.objects.filter(username__in=[user.username for user in users]).order_by('pk'))
+        subscriptions = Subscription.objects.bulk_create([
+            Subscription(
+                user=user, plan=self.plan, status='active',
+                start_date=self.today, end_date=self.today + timedelta(days=30),
+            )
+            for user in users
+        ])
+        WorkoutLog.objects.bulk_create([
+            WorkoutLog(user=user, workout_type=workout_type, duration=30, date=self.today)
+            for user in users for workout_type in ('cardio', 'strength')
+        ])
+        if with_profile:
+            subscriptions = Subscription.objects.filter(user__in=users)
+            MemberProfile.objects.bulk_create([
+                MemberProfile(user_id=sub.user_id, phone='0800', current_subscription=sub, active_until=sub.end_date)
+                for sub in subscriptions
+            ])
+
+    def _export(self):
+        User = get_user_model()
+        with CaptureQueriesContext(connection) as queries:
+            response = exports.users_subscriptions.stream(User.objects.all())
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        return lines, len(queries)
+
+    def test_query_count_does_not_grow_with_users(self):
+        self._add_members(1)
+        small_lines, small_queries = self._export()
+        self._add_members(500, offset=1)
+        self._add_members(500, offset=501, with_profile=False)
+        large_lines, large_queries = self._export()
+
+        self.assertEqual(len(small_lines), 2)
+        self.assertEqual(len(large_lines), 1002)
+        self.assertEqual(small_queries, large_queries)
+
+    def test_rows_carry_current_subscription_and_workout_count(self):
+        self._add_members(1)
+        self._add_members(1, offset=1, with_profile=False)
+        self._add_members(1, offset=2, with_profile=False)
+        Subscription.objects.filter(user__username='member2').delete()
+        lines, _ = self._export()
+        rows = {row[1]: row for row in (line.split(',') for line in lines[1:])}
+        end_date = str(self.today + timedelta(days=30))
+
+        self.assertEqual(rows['member0'][5:12], ['0800', 'Yes', 'Monthly', 'active', str(self.today), end_date, '30'])
+        self.assertEqual(rows['member1'][5:12], ['N/A', 'Yes', 'Monthly', 'active', str(self.today), end_date, '30'])
+        self.assertEqual(rows['member2'][5:12], ['N/A', 'No'] + ['N/A'] * 5)
+        self.assertEqual([rows[name][12] for name in ('member0', 'member1', 'member2')], ['2', '2', '2'])